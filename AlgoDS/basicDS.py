@@ -534,14 +534,14 @@ class IndexPQ(object):
         return self.size == 0
 
     def contains(self, i):
-        if i not in range(self.max):
+        if not 0 <= i < self.max:
             return False
         return self.qp[i] != -1
 
     def insert(self, index, k):
         """ insert key with the corresponding index """
         # check if index is valid
-        if index not in range(self.max):
+        if not 0 <= index < self.max:
             raise IndexOutOfBound("index out of range: 0 < index < max")
         # check if key associated with index already exists
         if self.contains(index):
@@ -562,7 +562,7 @@ class IndexPQ(object):
     def delete(self, i):
         """ delete key associated with the index i """
         # check if i is a valid index
-        if i not in range(self.max):
+        if not 0 <= i < self.max:
             raise IndexOutOfBound("i out of range: 0 < i < max")
         # check if key associated with index already exists
         if not self.contains(i):
@@ -613,7 +613,7 @@ class IndexPQ(object):
     def change_key(self, i, key):
         """ change the key at i """
         # check if i is a valid index
-        if i not in range(self.max):
+        if not 0 <= i < self.max:
             raise IndexOutOfBound("i out of range: 0 < i < max")
         # check if key associated with index already exists
         if not self.contains(i):
@@ -833,17 +833,18 @@ class UnionFind(object):
     3) are_connected(p, q)       -> are p, q connected ?
     4) find(p)                   -> find root of p
     5) union(p, q)               -> put p, q in same class.
+    With compress=True, find halves the path to the root, so the
+    finds take near constant amortized time.
     """
-    def __init__(self, size):
+    def __init__(self, size, compress=False):
         # id[i] is the parent of the site i
         # sz[i] is the number of sites rooted at i
         # cc is the number of connected components
         self.size = size
         self.cc = size
-        self.id = np.zeros([self.size], dtype=int)
+        self.compress = compress
+        self.id = np.arange(self.size)
         self.sz = np.ones([self.size], dtype=int)
-        for i in range(self.size):
-            self.id[i] = i
 
     def get_connected_components(self):
         return self.cc
@@ -856,6 +857,8 @@ class UnionFind(object):
     def find(self, p):
         """ find the root of p """
         while p != self.id[p]:
+            if self.compress:
+                self.id[p] = self.id[self.id[p]]
             p = self.id[p]
 
         return p
@@ -35,9 +35,12 @@ from AlgoDS.basicDS import Bag
 from AlgoDS.basicDS import Stack
 from AlgoDS.basicDS import Queue
 from AlgoDS.basicDS import MinPQ
+from AlgoDS.basicDS import IndexMinPQ
 from AlgoDS.basicDS import UnionFind
+from AlgoDS.basicDS import IllegalArgument
 
 import collections
+import os
 from sets import Set
 import numpy as np
 
@@ -46,6 +49,52 @@ class GraphReadError(Exception):
     pass
 
 
+def read_edge_list(path, weighted=False):
+    """ reads an edge list from path, returns V, an (E, 2) int array of
+    the edges and an array of the E weights (None if not weighted).
+    A text file has V and E on the first two lines and then one edge
+    v w (weight) per line; all the numbers are parsed in bulk by NumPy.
+    A directory written by save_edge_list is memory mapped instead.
+    """
+    if os.path.isdir(path):
+        vertices = int(np.load(os.path.join(path, "vertices.npy")))
+        edges = np.load(os.path.join(path, "edges.npy"), mmap_mode="r")
+        weights = None
+        weights_path = os.path.join(path, "weights.npy")
+        if weighted and os.path.exists(weights_path):
+            weights = np.load(weights_path, mmap_mode="r")
+        return vertices, edges, weights
+
+    columns = 3 if weighted else 2
+    numbers = np.fromfile(path, dtype=np.float64 if weighted else np.int64,
+                          sep=" ")
+    if len(numbers) < 2:
+        raise GraphReadError("Read Error in Graph")
+    vertices = int(numbers[0])
+    count = int(numbers[1])
+    if len(numbers) - 2 != count * columns:
+        raise GraphReadError("Read Error in Graph")
+    table = numbers[2:].reshape(count, columns)
+    edges = table[:, :2].astype(CSRGraph._index_dtype(vertices))
+    weights = table[:, 2].copy() if weighted else None
+    return vertices, edges, weights
+
+
+def save_edge_list(path, vertices, edges, weights=None):
+    """ writes an edge list in binary to the directory path, as
+    vertices.npy, edges.npy and weights.npy; read_edge_list maps it
+    back without parsing.
+    """
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    np.save(os.path.join(path, "vertices.npy"), np.int64(vertices))
+    np.save(os.path.join(path, "edges.npy"), np.asarray(edges),
+            allow_pickle=False)
+    if weights is not None:
+        np.save(os.path.join(path, "weights.npy"), np.asarray(weights),
+                allow_pickle=False)
+
+
 # Edge class for edge weighted graph type
 class Edge(object):
     """Edge class where each edge has a weight associated
@@ -75,6 +124,23 @@ class Edge(object):
         return self.weight
 
 
+class DirectedEdge(Edge):
+    """Weighted edge from v to w, for edge weighted digraphs. either()
+    is v and other(v) is w, like for Edge.
+    """
+    def __init__(self, v, w, weight):
+        super(DirectedEdge, self).__init__(v, w, weight)
+
+    def from_vertex(self):
+        return self.v
+
+    def to_vertex(self):
+        return self.w
+
+    def __str__(self):
+        return "%d->%d %.5f" % (self.v, self.w, self.weight)
+
+
 # Graph data structures
 class Graph(object):
     """Undirected Graph API """
@@ -85,28 +151,54 @@ class Graph(object):
         self.adj = np.empty([self.V], dtype=object)
         for j in range(len(self.adj)):
             self.adj[j] = Bag()
+        # functions called with v, w after each add_edge
+        self.observers = []
 
     @classmethod
     def read_from_file(cls, in_stream):
         """ Reads a Graph from input_stream """
-        lines = in_stream
-        G = cls(int(lines[0]))
+        lines = iter(in_stream)
+        G = cls(int(next(lines)))
 
-        edges = int(lines[1])
+        edges = int(next(lines))
 
         for line in lines:
-            G.add_edge(int(line.split()[0]), int(line.split()[1]))
+            fields = line.split()
+            if fields:
+                G.add_edge(int(fields[0]), int(fields[1]))
 
         if edges != G.E:
             raise GraphReadError("Read Error in Graph")
 
         return G
 
+    @classmethod
+    def read_from_path(cls, path):
+        """ Reads a Graph from a text or binary edge list, see
+        read_edge_list """
+        vertices, edges, weights = read_edge_list(path)
+        G = cls(vertices)
+        for v, w in edges.tolist():
+            G.add_edge(v, w)
+        return G
+
     def add_edge(self, v, w):
         """ add an edge from v to w and from w to v"""
         self.adj[v].add(w)
         self.adj[w].add(v)
         self.E += 1
+        self._notify(v, w)
+
+    def add_observer(self, observer):
+        """ observer(v, w) is called after each edge v w is added """
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        self.observers.remove(observer)
+
+    def _notify(self, v, w):
+        for observer in self.observers:
+            observer(v, w)
 
     def adjacent_to(self, v):
         """ returns the vertices adjacent to v """
@@ -140,6 +232,7 @@ class DirectedGraph(Graph):
     def add_edge(self, v, w):
         self.adj[v].add(w)
         self.E += 1
+        self._notify(v, w)
 
     def reverse(self):
         R = DirectedGraph(self.get_v())
@@ -151,23 +244,25 @@ class DirectedGraph(Graph):
 
 class EdgeWeightedGraph(Graph):
     """Edge Weighted Graph"""
+    edge_class = Edge
+
     def __init__(self, vertices):
         super(EdgeWeightedGraph, self).__init__(vertices)
 
     @classmethod
     def read_from_file(cls, in_stream):
         """ Reads a Graph from input_stream """
-        lines = in_stream
-        G = cls(int(lines[0]))
+        lines = iter(in_stream)
+        G = cls(int(next(lines)))
 
-        edges = int(lines[1])
+        edges = int(next(lines))
 
         for line in lines:
-            v = int(line.split()[0])
-            w = int(line.split()[1])
-            weight = float(line.split()[2])
-
-            tmp_edge = Edge(v, w, weight)
+            fields = line.split()
+            if not fields:
+                continue
+            tmp_edge = cls.edge_class(int(fields[0]), int(fields[1]),
+                                      float(fields[2]))
             G.add_edge(tmp_edge)
 
         if edges != G.E:
@@ -175,12 +270,25 @@ class EdgeWeightedGraph(Graph):
 
         return G
 
+    @classmethod
+    def read_from_path(cls, path):
+        """ Reads a Graph from a text or binary weighted edge list, see
+        read_edge_list """
+        vertices, edges, weights = read_edge_list(path, weighted=True)
+        if weights is None:
+            raise GraphReadError("Read Error in Graph: no weights")
+        G = cls(vertices)
+        for (v, w), weight in zip(edges.tolist(), weights.tolist()):
+            G.add_edge(cls.edge_class(v, w, weight))
+        return G
+
     def add_edge(self, e):
         v = e.either()
         w = e.other(v)
         self.adj[v].add(e)
         self.adj[w].add(e)
         self.E += 1
+        self._notify(v, w)
 
     def edges(self):
         """ return the edges """
@@ -201,7 +309,308 @@ class EdgeWeightedGraph(Graph):
         return s
 
 
+class EdgeWeightedDigraph(EdgeWeightedGraph):
+    """Edge Weighted Digraph: each DirectedEdge is in the adjacency
+    of its from vertex only.
+    """
+    edge_class = DirectedEdge
+
+    def __init__(self, vertices):
+        super(EdgeWeightedDigraph, self).__init__(vertices)
+
+    def add_edge(self, e):
+        self.adj[e.from_vertex()].add(e)
+        self.E += 1
+        self._notify(e.from_vertex(), e.to_vertex())
+
+    def edges(self):
+        """ return the edges """
+        ed = Bag()
+        for v in range(self.V):
+            for e in self.adj[v]:
+                ed.add(e)
+        return ed
+
+
+class CSRGraph(object):
+    """Frozen graph in compressed sparse row form. The vertices adjacent
+    to v are indices[indptr[v]:indptr[v + 1]], with the matching edge
+    weights in weights[indptr[v]:indptr[v + 1]] when the graph is edge
+    weighted. Uses two int arrays instead of one Python object per edge
+    end point; indices are int32 when V < 2^31, so an undirected graph
+    with 10^8 edges takes 0.8 GB, plus 1.6 GB of float64 weights.
+    An undirected edge is stored at both end points.
+    The arrays are read only.
+
+    arguments: indptr           -> int array of length V + 1
+               indices          -> int array of length indptr[V]
+               weights=None     -> array of length indptr[V], or None
+               directed=False   -> True if each edge is stored once
+    attributes:
+    1) from_graph(G)                    -> CSRGraph of a Graph, DirectedGraph
+                                           or EdgeWeightedGraph.
+    2) from_edges(V, edges, weights=None, directed=False)
+                                        -> CSRGraph of an (E, 2) edge array.
+    3) adjacent_to(v)                   -> array of the vertices adjacent to v.
+    4) weights_of(v)                    -> array of the weights of the edges
+                                           of v, in the order of adjacent_to.
+    5) degree(v)                        -> number of edges out of v.
+    6) edges()                          -> generator of the Edges, each
+                                           undirected edge once.
+    7) reverse()                        -> the reversed directed CSRGraph.
+    8) read_from_path(path, weighted=False, directed=False)
+                                        -> CSRGraph of an edge list file.
+    9) save(path), load(path, mmap=True)
+                                        -> binary .npy files in a directory.
+    10) get_v(), get_e(), is_directed()
+    """
+
+    def __init__(self, indptr, indices, weights=None, directed=False):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices)
+        if self.indices.dtype.kind not in "iu":
+            raise IllegalArgument("indices must be integers")
+        if self.indptr.ndim != 1 or len(self.indptr) == 0 or \
+                self.indptr[-1] != len(self.indices):
+            raise IllegalArgument("indptr does not match indices")
+        self.weights = None
+        if weights is not None:
+            self.weights = np.asarray(weights)
+            if len(self.weights) != len(self.indices):
+                raise IllegalArgument("weights do not match indices")
+            self.weights.flags.writeable = False
+        self.indptr.flags.writeable = False
+        self.indices.flags.writeable = False
+        self.directed = directed
+        self.V = len(self.indptr) - 1
+        self.E = len(self.indices) if directed else len(self.indices) // 2
+
+    @staticmethod
+    def _index_dtype(vertices):
+        if vertices < np.iinfo(np.int32).max:
+            return np.int32
+        return np.int64
+
+    @staticmethod
+    def _stable_order(src):
+        """ stable argsort of the source vertices. Sorting the keys
+        src << 32 | position with quicksort is much faster than mergesort;
+        they fit in an int64 while src < 2^31 and there are < 2^32 entries.
+        """
+        if len(src) >= 2 ** 32 or src.max() >= 2 ** 31:
+            return np.argsort(src, kind="mergesort")
+        order = src.astype(np.int64) << 32
+        order |= np.arange(len(src), dtype=np.int64)
+        order.sort()
+        order &= 0xFFFFFFFF
+        return order
+
+    @classmethod
+    def from_graph(cls, G):
+        """ CSRGraph with the adjacency of G, in the same order """
+        if isinstance(G, CSRGraph):
+            return G
+        V = G.get_v()
+        weighted = isinstance(G, EdgeWeightedGraph)
+        indptr = np.zeros([V + 1], dtype=np.int64)
+        for v in range(V):
+            indptr[v + 1] = indptr[v] + G.adjacent_to(v).size()
+        indices = np.empty([indptr[V]], dtype=cls._index_dtype(V))
+        weights = np.empty([indptr[V]]) if weighted else None
+        pos = 0
+        for v in range(V):
+            for item in G.adjacent_to(v):
+                if weighted:
+                    indices[pos] = item.other(v)
+                    weights[pos] = item.get_weight()
+                else:
+                    indices[pos] = item
+                pos += 1
+        directed = isinstance(G, (DirectedGraph, EdgeWeightedDigraph))
+        return cls(indptr, indices, weights, directed)
+
+    @classmethod
+    def from_edges(cls, vertices, edges, weights=None, directed=False):
+        """ CSRGraph of V vertices from an (E, 2) array of edges v w and
+        an optional array of E weights. The edges of each vertex keep
+        their order in the array.
+        """
+        edges = np.asarray(edges)
+        if edges.size == 0:
+            edges = edges.reshape(0, 2)
+        if edges.ndim != 2 or edges.shape[1] != 2:
+            raise IllegalArgument("edges must be an (E, 2) array")
+        if len(edges) and (edges.min() < 0 or edges.max() >= vertices):
+            raise IllegalArgument("edge vertex out of range")
+        src = edges[:, 0]
+        dst = edges[:, 1]
+        if weights is not None:
+            weights = np.asarray(weights)
+            if len(weights) != len(edges):
+                raise IllegalArgument("weights do not match edges")
+        if not directed:
+            # v w then w v for each edge, to keep the order of the array
+            src, dst = np.column_stack((src, dst)).ravel(), \
+                np.column_stack((dst, src)).ravel()
+            if weights is not None:
+                weights = np.repeat(weights, 2)
+        indptr = np.zeros([vertices + 1], dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=vertices), out=indptr[1:])
+        index_dtype = cls._index_dtype(vertices)
+        if np.all(src[:-1] <= src[1:]):
+            # already grouped by source, skip the sort
+            indices = dst.astype(index_dtype)
+        else:
+            order = cls._stable_order(src)
+            indices = dst[order].astype(index_dtype)
+            if weights is not None:
+                weights = weights[order]
+            del order
+        return cls(indptr, indices, weights, directed)
+
+    @classmethod
+    def read_from_path(cls, path, weighted=False, directed=False):
+        """ CSRGraph of a text or binary edge list, see read_edge_list """
+        vertices, edges, weights = read_edge_list(path, weighted)
+        return cls.from_edges(vertices, edges, weights, directed)
+
+    def save(self, path):
+        """ writes the arrays to the directory path as .npy files """
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        np.save(os.path.join(path, "indptr.npy"), self.indptr)
+        np.save(os.path.join(path, "indices.npy"), self.indices)
+        np.save(os.path.join(path, "directed.npy"), np.bool_(self.directed))
+        if self.weights is not None:
+            np.save(os.path.join(path, "weights.npy"), self.weights,
+                    allow_pickle=False)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """ CSRGraph written by save. With mmap the arrays are mapped read
+        only instead of read, so loading does not depend on the size.
+        """
+        mode = "r" if mmap else None
+        indptr = np.load(os.path.join(path, "indptr.npy"), mmap_mode=mode)
+        indices = np.load(os.path.join(path, "indices.npy"), mmap_mode=mode)
+        directed = bool(np.load(os.path.join(path, "directed.npy")))
+        weights = None
+        if os.path.exists(os.path.join(path, "weights.npy")):
+            weights = np.load(os.path.join(path, "weights.npy"),
+                              mmap_mode=mode)
+        return cls(indptr, indices, weights, directed)
+
+    def adjacent_to(self, v):
+        """ returns the vertices adjacent to v """
+        return self.indices[self.indptr[v]:self.indptr[v + 1]]
+
+    def weights_of(self, v):
+        """ returns the weights of the edges of v """
+        if self.weights is None:
+            return None
+        return self.weights[self.indptr[v]:self.indptr[v + 1]]
+
+    def degree(self, v):
+        return self.indptr[v + 1] - self.indptr[v]
+
+    def sources(self):
+        """ returns the source vertex of every entry of indices """
+        return np.repeat(np.arange(self.V, dtype=self.indices.dtype),
+                         np.diff(self.indptr))
+
+    def edges(self):
+        """ generator of the edges as Edge objects, with weight 1.0 if the
+        graph is not weighted. Undirected edges are given once, from the
+        lower vertex, and self loops are skipped like in EdgeWeightedGraph.
+        """
+        for v in range(self.V):
+            lo = self.indptr[v]
+            hi = self.indptr[v + 1]
+            for i in range(lo, hi):
+                w = int(self.indices[i])
+                if self.directed or w > v:
+                    weight = 1.0 if self.weights is None \
+                        else self.weights[i]
+                    if self.directed:
+                        yield DirectedEdge(v, w, weight)
+                    else:
+                        yield Edge(v, w, weight)
+
+    def reverse(self):
+        if not self.directed:
+            return self
+        edges = np.column_stack((self.indices, self.sources()))
+        return CSRGraph.from_edges(self.V, edges, self.weights, True)
+
+    def is_directed(self):
+        return self.directed
+
+    def get_v(self):
+        return self.V
+
+    def get_e(self):
+        return self.E
+
+    def __str__(self):
+        s = str(self.V) + " vertices " + str(self.E) + " Edges\n"
+        for v in range(self.V):
+            s += str(v) + " : "
+            weights = self.weights_of(v)
+            for i, w in enumerate(self.adjacent_to(v)):
+                s += str(w) + " "
+                if weights is not None:
+                    s += str(weights[i]) + " "
+            s += "\n"
+        return s
+
+
 # Graph processing classes
+def _weighted_edges(G, v):
+    """ edges out of v in an edge weighted graph or a weighted CSRGraph,
+    whose edges are made on the fly as DirectedEdges from v """
+    if isinstance(G, CSRGraph):
+        if G.weights is None:
+            raise IllegalArgument("CSRGraph has no weights")
+        return [DirectedEdge(v, w, weight) for w, weight in
+                zip(G.adjacent_to(v).tolist(), G.weights_of(v).tolist())]
+    return G.adjacent_to(v)
+
+
+def _depth_first(G, s, marked, pre=None, tree_edge=None, non_tree_edge=None,
+                 post=None):
+    """ depth first search from s with an explicit stack of (vertex,
+    adjacency iterator) pairs, so it works at any depth. Visits the
+    vertices in the same order as the recursive search and calls
+    pre(v) when v is marked, tree_edge(v, w) before going down from v to
+    an unmarked w, non_tree_edge(v, w) for a marked w and post(v) when
+    all of v is done. The search stops if non_tree_edge returns True.
+    Returns True if it was stopped.
+    """
+    marked[s] = True
+    if pre is not None:
+        pre(s)
+    stack = [(s, iter(G.adjacent_to(s)))]
+    while stack:
+        v, adjacency = stack[-1]
+        for w in adjacency:
+            if not marked[w]:
+                marked[w] = True
+                if tree_edge is not None:
+                    tree_edge(v, w)
+                if pre is not None:
+                    pre(w)
+                stack.append((w, iter(G.adjacent_to(w))))
+                break
+            if non_tree_edge is not None and non_tree_edge(v, w):
+                return True
+        else:
+            # adjacency of v is exhausted
+            stack.pop()
+            if post is not None:
+                post(v)
+    return False
+
+
 class Degrees(object):
     """docstring for Degrees"""
 
@@ -210,11 +619,15 @@ class Degrees(object):
         self.out_degree = np.zeros([G.get_v()], dtype=int)
         self.sources = Stack()
         self.sinks = Stack()
-        for vertex in range(G.get_v()):
-            adjacency = G.adjacent_to(vertex)
-            self.out_degree[vertex] = adjacency.size()
-            for w in adjacency:
-                self.in_degree[w] += 1
+        if isinstance(G, CSRGraph):
+            self.out_degree[:] = np.diff(G.indptr)
+            self.in_degree[:] = np.bincount(G.indices, minlength=G.get_v())
+        else:
+            for vertex in range(G.get_v()):
+                adjacency = G.adjacent_to(vertex)
+                self.out_degree[vertex] = adjacency.size()
+                for w in adjacency:
+                    self.in_degree[w] += 1
 
         for vertex in range(G.get_v()):
             if self.in_degree[vertex] == 0:
@@ -316,6 +729,47 @@ class ConnectedComponents(object):
         return self.id[v]
 
 
+class IncrementalConnectedComponents(object):
+    """ Connected components of an undirected graph kept up to date as
+    edges are added. Builds a UnionFind (with path compression) from the
+    edges of G once, then registers itself as an observer of G and
+    unions the end points of every edge added later, so each query
+    takes near constant time instead of a new DFS.
+    The id of a component is the root of its tree in the UnionFind, a
+    vertex of the component; unlike ConnectedComponents the ids are not
+    0..count-1, and they can change when components merge.
+
+    arguments: G -> Graph or EdgeWeightedGraph
+    attributes:
+    1) are_connected(v, w), get_count(), get_id(v)
+    2) detach()  -> stop following the edges added to G.
+    """
+
+    def __init__(self, G):
+        self.G = G
+        self.uf = UnionFind(G.get_v(), compress=True)
+        for v in range(G.get_v()):
+            for item in G.adjacent_to(v):
+                w = item.other(v) if isinstance(item, Edge) else item
+                self.uf.union(v, w)
+        G.add_observer(self._add_edge)
+
+    def _add_edge(self, v, w):
+        self.uf.union(v, w)
+
+    def detach(self):
+        self.G.remove_observer(self._add_edge)
+
+    def are_connected(self, v, w):
+        return self.uf.are_connected(v, w)
+
+    def get_count(self):
+        return self.uf.get_connected_components()
+
+    def get_id(self, v):
+        return self.uf.find(v)
+
+
 class DFS(Search):
     """D(epth)F(irst)S(earch) search class for a Graph object.
     """
@@ -340,24 +794,29 @@ class DFS(Search):
 
     def dfs(self, G, s, id):
         """ Depth first search. Mark s as visited, then
-        recursively visit the verticies adjacent to s, ignoring
+        visit the verticies adjacent to s, ignoring
         the vertex which has been marked before.
         """
-        if self.order_type == "pre":
-            self.order.enqueue(s)
-
-        self.marked[s] = True
-        if not (id is None):
-            id[s] = self.count
-        for w in G.adjacent_to(s):
-            if not self.is_marked(w):
-                self.edge_to[w] = s
-                self.dfs(G, w, id)
-
-        if self.order_type == "post":
-            self.order.enqueue(s)
-        if self.order_type == "reverse":
-            self.order.push(s)
+        count = self.count
+        edge_to = self.edge_to
+        order = self.order
+
+        def pre(v):
+            if self.order_type == "pre":
+                order.enqueue(v)
+            if id is not None:
+                id[v] = count
+
+        def tree_edge(v, w):
+            edge_to[w] = v
+
+        def post(v):
+            if self.order_type == "post":
+                order.enqueue(v)
+            if self.order_type == "reverse":
+                order.push(v)
+
+        _depth_first(G, s, self.marked, pre, tree_edge, post=post)
 
     def get_count(self):
         return self.count
@@ -405,6 +864,220 @@ class BFS(Search):
         return self.count
 
 
+class FrontierBFS(object):
+    """Breadth first search that expands a whole level at once with NumPy
+    gathers over the CSR arrays, instead of one vertex at a time. Any other
+    graph is converted with CSRGraph.from_graph. Gives the distance from
+    the nearest source and a parent on a shortest path for every vertex.
+    With packed=True the visited set is a bit array of V / 8 bytes, read
+    for every edge of a level instead of the 4V bytes of distances, which
+    keeps it in cache for huge vertex counts.
+
+    arguments: G               -> CSRGraph or graph
+               sources         -> iterable of source vertices
+               packed=False    -> use a bit array for the visited set
+    attributes:
+    1) get_distances()  -> int32 array of distances, -1 if unreachable.
+    2) get_parents()    -> array of parents, the source is its own parent
+                           and unreachable vertices have -1.
+    3) distance_to(v), has_path_to(v)
+    4) path_to(v)       -> Stack of the path from a source to v, None if
+                           v is unreachable.
+    5) get_levels()     -> number of levels, 1 + the largest distance.
+    """
+
+    def __init__(self, G, sources, packed=False):
+        G = CSRGraph.from_graph(G)
+        V = G.get_v()
+        sources = np.unique(np.asarray(list(sources), dtype=np.int64))
+        if len(sources) and (sources[0] < 0 or sources[-1] >= V):
+            raise IllegalArgument("source vertex out of range")
+        self.dist = np.full(V, -1, dtype=np.int32)
+        self.parent = np.full(V, -1, dtype=G.indices.dtype)
+        self.dist[sources] = 0
+        self.parent[sources] = sources
+        self.levels = 0
+        bits = None
+        if packed:
+            bits = np.zeros((V + 7) // 8, dtype=np.uint8)
+            self._mark(bits, sources)
+
+        frontier = sources.astype(G.indices.dtype)
+        while len(frontier):
+            self.levels += 1
+            # gather all the edges out of the frontier
+            starts = G.indptr[frontier]
+            counts = G.indptr[frontier + 1] - starts
+            total = counts.sum()
+            if total == 0:
+                break
+            offsets = np.cumsum(counts) - counts
+            positions = np.arange(total) + np.repeat(starts - offsets, counts)
+            adjacent = G.indices[positions]
+            parents = np.repeat(frontier, counts)
+            if packed:
+                unseen = (bits[adjacent >> 3] >> (adjacent & 7)) & 1 == 0
+            else:
+                unseen = self.dist[adjacent] < 0
+            adjacent = adjacent[unseen]
+            parents = parents[unseen]
+            if len(adjacent) < np.iinfo(self.parent.dtype).max:
+                # one edge to each new vertex: write the edge positions in
+                # parent and keep the edges whose position stayed there
+                positions = np.arange(len(adjacent), dtype=self.parent.dtype)
+                self.parent[adjacent] = positions
+                kept = self.parent[adjacent] == positions
+            else:
+                kept = np.unique(adjacent, return_index=True)[1]
+            frontier = adjacent[kept]
+            self.parent[frontier] = parents[kept]
+            self.dist[frontier] = self.levels
+            if packed:
+                frontier.sort()
+                self._mark(bits, frontier)
+
+    @staticmethod
+    def _mark(bits, vertices):
+        """ sets the bits of the sorted vertices """
+        if len(vertices) == 0:
+            return
+        byte = vertices >> 3
+        starts = np.flatnonzero(np.concatenate(([True],
+                                                byte[1:] != byte[:-1])))
+        masks = np.left_shift(1, vertices & 7).astype(np.uint8)
+        bits[byte[starts]] |= np.bitwise_or.reduceat(masks, starts)
+
+    def get_distances(self):
+        return self.dist
+
+    def get_parents(self):
+        return self.parent
+
+    def get_levels(self):
+        return self.levels
+
+    def distance_to(self, v):
+        return self.dist[v]
+
+    def has_path_to(self, v):
+        return self.dist[v] >= 0
+
+    def path_to(self, v):
+        """ find path from v to its nearest source """
+        if not self.has_path_to(v):
+            return None
+        stack_of_path = Stack()
+        current = v
+        while self.parent[current] != current:
+            stack_of_path.push(current)
+            current = self.parent[current]
+        stack_of_path.push(current)
+        return stack_of_path
+
+
+class BidirectionalBFS(object):
+    """Point to point shortest paths in an unweighted graph. Each query
+    searches forward from s and backward from t, one whole level at a
+    time from the side with the smaller frontier, and stops at the end
+    of the level where the two searches meet. Only the vertices near s
+    and t are touched, and they are kept in dicts, so a query does not
+    cost O(V). The reverse of a DirectedGraph or a directed CSRGraph is
+    built on the first query and reused until edges are added to G.
+
+    arguments: G -> Graph, DirectedGraph or CSRGraph
+    attributes:
+    1) path(s, t)     -> Stack of the vertices of a shortest path from s
+                         to t, None if there is no path.
+    2) distance(s, t) -> number of edges on a shortest path, -1 if none.
+    3) get_touched()  -> number of vertices reached by the last query.
+    """
+
+    def __init__(self, G):
+        self.G = G
+        self._reverse = None
+        self._reverse_e = 0
+        self.touched = 0
+
+    def _reverse_graph(self):
+        """ the reverse graph, built again if edges were added to G """
+        if self._reverse is None or self._reverse_e != self.G.get_e():
+            directed = isinstance(self.G, DirectedGraph) or \
+                (isinstance(self.G, CSRGraph) and self.G.is_directed())
+            self._reverse = self.G.reverse() if directed else self.G
+            self._reverse_e = self.G.get_e()
+        return self._reverse
+
+    @staticmethod
+    def _expand(G, frontier, parent, dist, other_dist):
+        """ adds the next level of one search, returns it and the best
+        vertex where it meets the other search """
+        level = []
+        meet = None
+        best = None
+        for v in frontier:
+            d = dist[v] + 1
+            for w in G.adjacent_to(v):
+                if w in dist:
+                    continue
+                dist[w] = d
+                parent[w] = v
+                level.append(w)
+                if w in other_dist and \
+                        (best is None or d + other_dist[w] < best):
+                    meet = w
+                    best = d + other_dist[w]
+        return level, meet
+
+    def _search(self, s, t):
+        """ returns the meeting vertex and the parents of both searches """
+        V = self.G.get_v()
+        if not (0 <= s < V and 0 <= t < V):
+            raise IllegalArgument("vertex out of range")
+        forward = self.G
+        backward = self._reverse_graph()
+        parent_f = {s: s}
+        parent_b = {t: t}
+        dist_f = {s: 0}
+        dist_b = {t: 0}
+        frontier_f = [s]
+        frontier_b = [t]
+        meet = s if s == t else None
+        while meet is None and frontier_f and frontier_b:
+            if len(frontier_f) <= len(frontier_b):
+                frontier_f, meet = self._expand(forward, frontier_f,
+                                                parent_f, dist_f, dist_b)
+            else:
+                frontier_b, meet = self._expand(backward, frontier_b,
+                                                parent_b, dist_b, dist_f)
+        self.touched = len(dist_f) + len(dist_b)
+        return meet, parent_f, parent_b
+
+    def path(self, s, t):
+        """ shortest path from s to t, s on top of the Stack """
+        meet, parent_f, parent_b = self._search(s, t)
+        if meet is None:
+            return None
+        vertices = [meet]
+        while vertices[-1] != s:
+            vertices.append(parent_f[vertices[-1]])
+        vertices.reverse()
+        while vertices[-1] != t:
+            vertices.append(parent_b[vertices[-1]])
+        stack_of_path = Stack()
+        for v in reversed(vertices):
+            stack_of_path.push(v)
+        return stack_of_path
+
+    def distance(self, s, t):
+        path = self.path(s, t)
+        if path is None:
+            return -1
+        return path.size() - 1
+
+    def get_touched(self):
+        return self.touched
+
+
 class DetectCycle(object):
     """Detect cycle in directed graph"""
 
@@ -416,34 +1089,39 @@ class DetectCycle(object):
         # Loop over vertices and do depth first search until
         # cycle is detected
         for v in range(G.get_v()):
-            if (not self.marked[v]) and (self.cycle is None):
-                self.depth_search(G, v)
-            else:
+            if self.cycle is not None:
                 break
+            if not self.marked[v]:
+                self.depth_search(G, v)
 
     def depth_search(self, G, v):
-        # Mark v and put it on stack
-        self.on_stack[v] = True
-        self.marked[v] = True
-        for w in G.adjacent_to(v):
-            # if we found cycle, no need to continue
-            if self.cycle is not None:
-                return
-            # if not marked do depth search
-            # else check if we have a cycle
-            if not self.marked[w]:
-                self.edge_to[w] = v
-                self.depth_search(G, w)
-            elif self.on_stack[w]:
-                self.cycle = Stack()
-                current = v
-                while not current == w:
-                    self.cycle.push(current)
-                    current = self.edge_to[current]
-                self.cycle.push(w)
-                self.cycle.push(v)
-        # returning from function, make on stack false
-        self.on_stack[v] = False
+        on_stack = self.on_stack
+        edge_to = self.edge_to
+
+        # v is on the stack while its descendants are searched
+        def pre(v):
+            on_stack[v] = True
+
+        def tree_edge(v, w):
+            edge_to[w] = v
+
+        def non_tree_edge(v, w):
+            # an edge back to a vertex on the stack closes a cycle
+            if not on_stack[w]:
+                return False
+            self.cycle = Stack()
+            current = v
+            while not current == w:
+                self.cycle.push(current)
+                current = edge_to[current]
+            self.cycle.push(w)
+            self.cycle.push(v)
+            return True
+
+        def post(v):
+            on_stack[v] = False
+
+        _depth_first(G, v, self.marked, pre, tree_edge, non_tree_edge, post)
 
     def get_cycle(self):
         return self.cycle
@@ -493,6 +1171,75 @@ class TopologicalSort(object):
         return self.sortable
 
 
+class KahnTopologicalSort(object):
+    """Topological sort by Kahn's algorithm over the CSR arrays, one pass
+    that also detects cycles. The in-degrees come from one bincount;
+    then each step removes the whole level of vertices with in-degree 0
+    at once, and takes the in-degrees of their targets down with
+    NumPy. The order lists the levels in turn, each level sorted by
+    vertex. If a cycle stops the sort, the vertices that could not be
+    sorted are kept: the vertices on cycles and those reachable from
+    them. Any other graph is converted with CSRGraph.from_graph.
+
+    attributes:
+    1) sort()                 -> int array of the vertices in topological
+                                 order, None if G has a cycle.
+    2) is_DAG()
+    3) get_level(v)           -> length of the longest path to v, -1 if
+                                 v was not sorted.
+    4) get_cyclic_vertices()  -> int array of the vertices left, None if
+                                 G is a DAG.
+    """
+
+    def __init__(self, G):
+        G = CSRGraph.from_graph(G)
+        V = G.get_v()
+        in_degree = np.bincount(G.indices, minlength=V)
+        self.level = np.full(V, -1, dtype=np.int64)
+        levels = []
+        frontier = np.flatnonzero(in_degree == 0)
+        depth = 0
+        while len(frontier):
+            self.level[frontier] = depth
+            levels.append(frontier)
+            depth += 1
+            # targets of all the edges out of the level
+            starts = G.indptr[frontier]
+            counts = G.indptr[frontier + 1] - starts
+            total = counts.sum()
+            if total == 0:
+                break
+            offsets = np.cumsum(counts) - counts
+            targets = G.indices[np.arange(total) +
+                                np.repeat(starts - offsets, counts)]
+            if 8 * total > V:
+                in_degree -= np.bincount(targets, minlength=V)
+            else:
+                np.subtract.at(in_degree, targets, 1)
+            # each vertex reaches 0 once, through one of its edges
+            frontier = np.unique(targets[in_degree[targets] == 0])
+        self.order = np.concatenate(levels) if levels else \
+            np.zeros([0], dtype=np.int64)
+        self.sortable = len(self.order) == V
+        self.cyclic = None
+        if not self.sortable:
+            self.cyclic = np.flatnonzero(self.level < 0)
+
+    def sort(self):
+        if self.sortable:
+            return self.order
+        return None
+
+    def is_DAG(self):
+        return self.sortable
+
+    def get_level(self, v):
+        return self.level[v]
+
+    def get_cyclic_vertices(self):
+        return self.cyclic
+
+
 class StrongCC(ConnectedComponents):
     """strongly connected components of a directed Graph.
     Two vertices v, w are strongly connected if there is a
@@ -508,6 +1255,56 @@ class StrongCC(ConnectedComponents):
         super(StrongCC, self).__init__(G, order=top_order.get_order())
 
 
+class TarjanSCC(ConnectedComponents):
+    """strongly connected components of a directed Graph by
+    Tarjan's algorithm: one depth first search, with an explicit stack,
+    that keeps the vertices of the open components on a stack. low[v] is
+    the smallest preorder number reachable from v through the search
+    tree and one edge back to the stack; v is the root of a component
+    when low[v] == pre[v], and the component is popped off the stack.
+    No reverse graph is built. Components are numbered in reverse
+    topological order. Same API as StrongCC.
+    """
+
+    def __init__(self, G):
+        V = G.get_v()
+        pre = np.full(V, -1, dtype=np.int64)
+        low = np.zeros([V], dtype=np.int64)
+        # id is -1 while the vertex is on the component stack
+        self.id = np.full(V, -1, dtype=int)
+        self.count = 0
+        counter = 0
+        components = []
+        for s in range(V):
+            if pre[s] != -1:
+                continue
+            pre[s] = low[s] = counter
+            counter += 1
+            components.append(s)
+            stack = [(s, iter(G.adjacent_to(s)))]
+            while stack:
+                v, adjacency = stack[-1]
+                for w in adjacency:
+                    if pre[w] == -1:
+                        pre[w] = low[w] = counter
+                        counter += 1
+                        components.append(w)
+                        stack.append((w, iter(G.adjacent_to(w))))
+                        break
+                    if self.id[w] == -1 and pre[w] < low[v]:
+                        low[v] = pre[w]
+                else:
+                    stack.pop()
+                    if stack and low[v] < low[stack[-1][0]]:
+                        low[stack[-1][0]] = low[v]
+                    if low[v] == pre[v]:
+                        w = None
+                        while w != v:
+                            w = components.pop()
+                            self.id[w] = self.count
+                        self.count += 1
+
+
 class ShortestAncestralPath(object):
     """finds the shortest distance to a common ancestor in a
     directed graph.
@@ -836,4 +1633,187 @@ class KruskalMST(object):
     def get_mst(self):
         return self.mst
 
+    def edges(self):
+        return self.mst
+
+    def weight(self):
+        return sum(e.get_weight() for e in self.mst)
+
+
+class PrimMST(object):
+    """Minimum Spanning Tree (a forest if G is not connected) using the
+    eager version of Prim's Algorithm. An IndexMinPQ holds, for each
+    vertex not in the tree, the lightest edge connecting it to the tree,
+    so the PQ has at most V entries and the time is O(E log V). Better
+    than Kruskal for dense graphs. Takes an EdgeWeightedGraph or an
+    undirected weighted CSRGraph.
+    """
+    def __init__(self, G):
+        V = G.get_v()
+        self.edge_to = np.empty([V], dtype=object)
+        self.dist_to = np.full(V, np.inf)
+        self.marked = np.zeros([V], dtype=bool)
+        self.pq = IndexMinPQ(V)
+        for v in range(V):
+            if not self.marked[v]:
+                self._prim(G, v)
+
+    def _prim(self, G, s):
+        self.dist_to[s] = 0.0
+        self.pq.insert(s, 0.0)
+        while not self.pq.is_empty():
+            v = self.pq.delete_min()
+            self.marked[v] = True
+            for e in _weighted_edges(G, v):
+                w = e.other(v)
+                if self.marked[w] or e.get_weight() >= self.dist_to[w]:
+                    continue
+                # e is the lightest edge from w to the tree so far
+                self.edge_to[w] = e
+                self.dist_to[w] = e.get_weight()
+                if self.pq.contains(w):
+                    self.pq.change_key(w, self.dist_to[w])
+                else:
+                    self.pq.insert(w, self.dist_to[w])
+
+    def edges(self):
+        """ return the edges of the MST """
+        mst = Queue()
+        for e in self.edge_to:
+            if e is not None:
+                mst.enqueue(e)
+        return mst
+
+    def weight(self):
+        return sum(e.get_weight() for e in self.edge_to if e is not None)
+
+
+class SortedKruskalMST(object):
+    """Minimum Spanning Tree (a forest if G is not connected) using
+    Kruskal's Algorithm on arrays: the edges are taken as int arrays of
+    end points and a float array of weights, sorted once with argsort,
+    and scanned in order with a union find over int lists with path
+    halving and union by size. Stops after V - 1 edges. Only the MST
+    edges are made into Edge objects. Takes an EdgeWeightedGraph or an
+    undirected weighted CSRGraph.
+    """
+    def __init__(self, G):
+        V = G.get_v()
+        src, dst, weights = self._edge_arrays(G)
+        order = np.argsort(weights)
+        parent = range(V)
+        size = [1] * V
+        chosen = []
+        for i, v, w in zip(order.tolist(), src[order].tolist(),
+                           dst[order].tolist()):
+            # find the roots, halving the paths
+            while v != parent[v]:
+                parent[v] = parent[parent[v]]
+                v = parent[v]
+            while w != parent[w]:
+                parent[w] = parent[parent[w]]
+                w = parent[w]
+            if v == w:
+                continue
+            if size[v] < size[w]:
+                v, w = w, v
+            parent[w] = v
+            size[v] += size[w]
+            chosen.append(i)
+            if len(chosen) == V - 1:
+                break
+        self.mst = Queue()
+        for i in chosen:
+            self.mst.enqueue(Edge(int(src[i]), int(dst[i]), weights[i]))
+        self.total = float(weights[chosen].sum())
+
+    @staticmethod
+    def _edge_arrays(G):
+        """ end points and weights of each undirected edge once """
+        if isinstance(G, CSRGraph):
+            if G.weights is None:
+                raise IllegalArgument("CSRGraph has no weights")
+            src = G.sources()
+            keep = src < G.indices
+            return src[keep], G.indices[keep], G.weights[keep]
+        edges = list(G.edges())
+        src = np.array([e.either() for e in edges], dtype=np.int64)
+        dst = np.array([e.other(e.either()) for e in edges], dtype=np.int64)
+        weights = np.array([e.get_weight() for e in edges], dtype=np.float64)
+        return src, dst, weights
+
+    def edges(self):
+        return self.mst
+
+    def weight(self):
+        return self.total
+
+
+class DijkstraSP(object):
+    """Shortest paths from a source in a graph with non negative edge
+    weights, using Dijkstra's algorithm on an IndexMinPQ of the vertices
+    keyed by their distance. Takes an EdgeWeightedDigraph, an
+    EdgeWeightedGraph or a weighted CSRGraph. Given a target, the search
+    stops once the target is taken off the PQ: the results are then final
+    for the target and the vertices closer than it only.
+
+    arguments: G              -> edge weighted graph
+               s              -> source vertex
+               target=None    -> stop when the path to target is known
+    attributes:
+    1) dist_to(v)      -> distance from s to v, inf if unreachable.
+    2) has_path_to(v)  -> is there a path from s to v?
+    3) path_to(v)      -> Stack of the edges from s to v, None if there
+                          is no path.
+    """
+
+    def __init__(self, G, s, target=None):
+        V = G.get_v()
+        if not 0 <= s < V:
+            raise IllegalArgument("source vertex out of range")
+        self.source = s
+        self.dist = np.full(V, np.inf)
+        self.edge_to = np.empty([V], dtype=object)
+        self.dist[s] = 0.0
+        pq = IndexMinPQ(V)
+        pq.insert(s, 0.0)
+        while not pq.is_empty():
+            v = pq.delete_min()
+            if v == target:
+                break
+            for e in _weighted_edges(G, v):
+                self._relax(pq, v, e)
+
+    def _relax(self, pq, v, e):
+        weight = e.get_weight()
+        if weight < 0:
+            raise IllegalArgument("negative edge weight")
+        w = e.other(v)
+        dist = self.dist[v] + weight
+        if dist < self.dist[w]:
+            self.dist[w] = dist
+            if not isinstance(e, DirectedEdge):
+                # undirected edges are kept in the direction of the path
+                e = DirectedEdge(v, w, weight)
+            self.edge_to[w] = e
+            if pq.contains(w):
+                pq.change_key(w, dist)
+            else:
+                pq.insert(w, dist)
 
+    def dist_to(self, v):
+        return self.dist[v]
+
+    def has_path_to(self, v):
+        return self.dist[v] < np.inf
+
+    def path_to(self, v):
+        """ edges of the shortest path from the source to v """
+        if not self.has_path_to(v):
+            return None
+        stack_of_path = Stack()
+        e = self.edge_to[v]
+        while e is not None:
+            stack_of_path.push(e)
+            e = self.edge_to[e.either()]
+        return stack_of_path
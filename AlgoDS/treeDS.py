@@ -2,8 +2,13 @@
 keys must have __cmp__ or __lt__ and __eq__ impelemented.
 """
 from AlgoDS.basicDS import Stack
-from AlgoDS.basicDS import Queue
+from AlgoDS.basicDS import IllegalArgument
+from AlgoDS.basicDS import IndexOutOfBound
+from collections import OrderedDict
 import numpy as np
+import os
+import random
+import threading
 
 
 def is_comparable(obj):
@@ -11,6 +16,66 @@ def is_comparable(obj):
         (hasattr(obj, "__lt__") and hasattr(obj, "__eq__"))
 
 
+def _save_array(path, name, values):
+    """ saves a list of numbers or strings in the directory path, without
+    pickle. Numbers go to name.npy. Strings are encoded in a byte arena,
+    name.utf8.npy for text or name.bytes.npy for byte strings, and
+    name.offsets.npy gives the start of each string in the arena.
+    """
+    arr = np.array(values)
+    if len(values) == 0 or (arr.ndim == 1 and arr.dtype.kind in "biuf"):
+        np.save(os.path.join(path, name + ".npy"), arr, allow_pickle=False)
+        return
+    if all(isinstance(value, bytes) for value in values):
+        encoded = values
+        kind = "bytes"
+    elif all(isinstance(value, type(u"")) for value in values):
+        encoded = [value.encode("utf-8") for value in values]
+        kind = "utf8"
+    else:
+        raise IllegalArgument("only numbers and strings can be saved")
+    lengths = np.array([len(value) for value in encoded], dtype=np.int64)
+    offsets = np.zeros([len(encoded) + 1], dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    arena = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    np.save(os.path.join(path, name + "." + kind + ".npy"), arena,
+            allow_pickle=False)
+    np.save(os.path.join(path, name + ".offsets.npy"), offsets,
+            allow_pickle=False)
+
+
+def _load_array(path, name, mmap=False):
+    """ loads an array saved by _save_array. Numbers come back as a numpy
+    array, memory mapped (copy on write) if mmap is True, and strings
+    as a list.
+    """
+    numeric = os.path.join(path, name + ".npy")
+    if os.path.exists(numeric):
+        return np.load(numeric, mmap_mode="c" if mmap else None,
+                       allow_pickle=False)
+    offsets = np.load(os.path.join(path, name + ".offsets.npy"),
+                      allow_pickle=False).tolist()
+    for kind in ["bytes", "utf8"]:
+        arena_file = os.path.join(path, name + "." + kind + ".npy")
+        if os.path.exists(arena_file):
+            arena = np.load(arena_file, allow_pickle=False).tobytes()
+            values = [arena[offsets[indx]:offsets[indx + 1]]
+                      for indx in range(len(offsets) - 1)]
+            if kind == "utf8":
+                values = [value.decode("utf-8") for value in values]
+            return values
+    raise IllegalArgument("no saved " + name + " in " + path)
+
+
+def _save_table(path, keys, vals):
+    """ saves the keys and values of a symbol table in the directory
+    path, created if needed """
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    _save_array(path, "keys", keys)
+    _save_array(path, "vals", vals)
+
+
 class NotComparable(Exception):
     """elements not comparable"""
     pass
@@ -28,6 +93,7 @@ class UnOrderedSeqST(object):
     2) __getitem__(key)        -> returns value associated with the key.
     3) __contains__(key)       -> checks to see if key is in the ST.
     4) size()                  -> get size of ST.
+    5) delete(key)             -> removes the key from the ST.
     """
     class _Node(object):
         """inner node class"""
@@ -50,11 +116,11 @@ class UnOrderedSeqST(object):
             # add a new key value pair
             old_head = self._head
             self._head = UnOrderedSeqST._Node(key, value, old_head)
+            # update size
+            self._size += 1
         else:
             # update the key with new value
             node_with_key.value = value
-        # update size
-        self._size += 1
 
     def _get(self, key):
         """ returns the value associated with the key. if key does not
@@ -68,15 +134,11 @@ class UnOrderedSeqST(object):
             return node_with_key.value
 
     def _check_key(self, key, head):
-        """ checks recursively if key is in the ST. if not returns
+        """ checks if key is in the ST. if not returns
         None link, if yes returns the link"""
-        if head is None:
-            return head
-        else:
-            if head.key == key:
-                return head
-            else:
-                return UnOrderedSeqST._check_key(self, key, head.next)
+        while head is not None and not head.key == key:
+            head = head.next
+        return head
 
     def __setitem__(self, key, value):
         self._put(key, value)
@@ -85,10 +147,22 @@ class UnOrderedSeqST(object):
         return self._get(key)
 
     def __contains__(self, key):
-        if self._get(key):
-            return True
+        return self._check_key(key, self._head) is not None
+
+    def delete(self, key):
+        """ removes the key and its value, if key is in the ST """
+        previous = None
+        node = self._head
+        while node is not None and not node.key == key:
+            previous = node
+            node = node.next
+        if node is None:
+            return
+        if previous is None:
+            self._head = node.next
         else:
-            return False
+            previous.next = node.next
+        self._size -= 1
 
     def keys(self):
         "returns the key in a stack"
@@ -105,6 +179,228 @@ class UnOrderedSeqST(object):
         return self._size
 
 
+class SeparateChainingHashST(object):
+    """Unordered symbol table implemented as a hash table with separate
+    chaining. An array of m chains, where each chain is an UnOrderedSeqST
+    holding the keys that hash to its index. The array is doubled when the
+    average chain length reaches max_load and halved when it drops to a
+    quarter of it, so put, get, contains and delete take constant expected
+    time. Keys must be hashable by hash_func and have __eq__.
+
+    arguments: capacity=4   -> initial number of chains
+               hash_func=hash -> function mapping a key to an int
+               max_load=8.0 -> average chain length that triggers a resize
+    attributes:
+    1) __setitem__(key, value) -> adds key,value pair to the ST.
+    2) __getitem__(key)        -> returns value associated with the key.
+    3) __contains__(key)       -> checks to see if key is in the ST.
+    4) delete(key)             -> removes the key from the ST.
+    5) keys()                  -> generator of the keys.
+    6) size()                  -> get size of ST.
+    """
+
+    def __init__(self, capacity=4, hash_func=None, max_load=8.0):
+        if capacity < 1:
+            raise IllegalArgument("capacity must be positive")
+        if max_load <= 0:
+            raise IllegalArgument("max_load must be positive")
+        self._hash_func = hash if hash_func is None else hash_func
+        self._max_load = max_load
+        self._min_capacity = capacity
+        self._size = 0
+        self._chains = self._new_chains(capacity)
+
+    def _new_chains(self, capacity):
+        chains = np.empty([capacity], dtype=object)
+        for indx in range(capacity):
+            chains[indx] = UnOrderedSeqST()
+        return chains
+
+    def _hash(self, key):
+        """ index of the chain of key """
+        return self._hash_func(key) % len(self._chains)
+
+    def _resize(self, capacity):
+        """ rehash every key into a new array of chains """
+        old_chains = self._chains
+        self._chains = self._new_chains(capacity)
+        for chain in old_chains:
+            node = chain._head
+            while node is not None:
+                self._chains[self._hash(node.key)][node.key] = node.value
+                node = node.next
+
+    def __setitem__(self, key, value):
+        chain = self._chains[self._hash(key)]
+        old_size = chain.size()
+        chain[key] = value
+        if chain.size() > old_size:
+            self._size += 1
+            if self._size >= self._max_load * len(self._chains):
+                self._resize(2 * len(self._chains))
+
+    def __getitem__(self, key):
+        return self._chains[self._hash(key)][key]
+
+    def __contains__(self, key):
+        return key in self._chains[self._hash(key)]
+
+    def delete(self, key):
+        """ removes the key and its value, if key is in the ST """
+        chain = self._chains[self._hash(key)]
+        old_size = chain.size()
+        chain.delete(key)
+        if chain.size() < old_size:
+            self._size -= 1
+            if len(self._chains) > self._min_capacity and \
+                    self._size <= self._max_load * len(self._chains) / 4:
+                self._resize(max(self._min_capacity,
+                                 len(self._chains) // 2))
+
+    def keys(self):
+        """ returns a generator of the keys, in no particular order """
+        for chain in self._chains:
+            node = chain._head
+            while node is not None:
+                yield node.key
+                node = node.next
+
+    def __iter__(self):
+        return self.keys()
+
+    def size(self):
+        "returns size of the ST"
+        return self._size
+
+    def is_empty(self):
+        return self._size == 0
+
+
+class LinearProbingHashST(object):
+    """Unordered symbol table implemented as a hash table with linear
+    probing. Keys and values are kept in two parallel arrays of size m, a
+    key is stored in the first free slot at or after its hash index. The
+    arrays are doubled when the table is more than max_load full and halved
+    when it is less than an eighth full. Deletion shifts the following
+    keys of the cluster back (Knuth's algorithm R), so no tombstones are
+    left behind and searches stay short. Keys can not be None, must be
+    hashable by hash_func and have __eq__.
+
+    arguments: capacity=16  -> initial size of the arrays
+               hash_func=hash -> function mapping a key to an int
+               max_load=0.5 -> fraction of used slots that triggers a resize
+    attributes:
+    1) __setitem__(key, value) -> adds key,value pair to the ST.
+    2) __getitem__(key)        -> returns value associated with the key.
+    3) __contains__(key)       -> checks to see if key is in the ST.
+    4) delete(key)             -> removes the key from the ST.
+    5) keys()                  -> generator of the keys.
+    6) size()                  -> get size of ST.
+    """
+
+    def __init__(self, capacity=16, hash_func=None, max_load=0.5):
+        if capacity < 1:
+            raise IllegalArgument("capacity must be positive")
+        if not 0 < max_load < 1:
+            raise IllegalArgument("max_load must be in (0, 1)")
+        self._hash_func = hash if hash_func is None else hash_func
+        self._max_load = max_load
+        self._min_capacity = capacity
+        self._size = 0
+        self._keys = np.empty([capacity], dtype=object)
+        self._vals = np.empty([capacity], dtype=object)
+
+    def _hash(self, key):
+        return self._hash_func(key) % len(self._keys)
+
+    def _find(self, key):
+        """ returns the slot holding key, or the empty slot that ends
+        the probe sequence of key
+        """
+        m = len(self._keys)
+        indx = self._hash(key)
+        while self._keys[indx] is not None and \
+                not self._keys[indx] == key:
+            indx = (indx + 1) % m
+        return indx
+
+    def _resize(self, capacity):
+        old_keys = self._keys
+        old_vals = self._vals
+        self._keys = np.empty([capacity], dtype=object)
+        self._vals = np.empty([capacity], dtype=object)
+        for indx in range(len(old_keys)):
+            if old_keys[indx] is not None:
+                slot = self._find(old_keys[indx])
+                self._keys[slot] = old_keys[indx]
+                self._vals[slot] = old_vals[indx]
+
+    def __setitem__(self, key, value):
+        if key is None:
+            raise IllegalArgument("key can not be None")
+        if self._size + 1 > self._max_load * len(self._keys):
+            self._resize(2 * len(self._keys))
+        indx = self._find(key)
+        if self._keys[indx] is None:
+            self._keys[indx] = key
+            self._size += 1
+        self._vals[indx] = value
+
+    def __getitem__(self, key):
+        if key is None:
+            return None
+        return self._vals[self._find(key)]
+
+    def __contains__(self, key):
+        if key is None:
+            return False
+        return self._keys[self._find(key)] is not None
+
+    def delete(self, key):
+        """ removes the key and its value, if key is in the ST. The keys
+        after it in the same cluster are moved back into the hole if the
+        hole lies between their hash index and their slot.
+        """
+        if key not in self:
+            return
+        m = len(self._keys)
+        hole = self._find(key)
+        self._keys[hole] = None
+        self._vals[hole] = None
+        self._size -= 1
+
+        indx = (hole + 1) % m
+        while self._keys[indx] is not None:
+            home = self._hash(self._keys[indx])
+            # distance of indx from its home >= distance from the hole
+            if (indx - home) % m >= (indx - hole) % m:
+                self._keys[hole] = self._keys[indx]
+                self._vals[hole] = self._vals[indx]
+                self._keys[indx] = None
+                self._vals[indx] = None
+                hole = indx
+            indx = (indx + 1) % m
+
+        if m > self._min_capacity and self._size <= m / 8:
+            self._resize(max(self._min_capacity, m // 2))
+
+    def keys(self):
+        """ returns a generator of the keys, in no particular order """
+        for key in self._keys:
+            if key is not None:
+                yield key
+
+    def __iter__(self):
+        return self.keys()
+
+    def size(self):
+        "returns size of the ST"
+        return self._size
+
+    def is_empty(self):
+        return self._size == 0
+
+
 class BinarySearchST(object):
     """Ordered symbol table using resizing arrays for both keys and values.
     search is done through a binary search algorithm.
@@ -117,12 +413,17 @@ class BinarySearchST(object):
     2) __getitem__(key)        -> returns value associated with the key.
     3) __contains__(key)       -> checks to see if key is in the ST.
     4) size()                  -> returns size of ST
+    5) from_sorted(keys, vals) -> builds the ST from sorted keys.
+    6) from_items(items)       -> builds the ST from (key, value) pairs.
+    7) put_many(keys, vals)    -> adds a batch of key, value pairs.
+    8) get_many(keys)          -> returns the values of a batch of keys.
     """
 
     def __init__(self):
         self._keys = np.empty([1], dtype=object)
         self._vals = np.empty([1], dtype=object)
         self._size = 0
+        self._numeric_keys = None
 
     def _resize(self):
         # create temp arrays
@@ -135,61 +436,31 @@ class BinarySearchST(object):
         self._keys = arr_k
         self._vals = arr_v
 
-    def _check_key(self, key_flag, key, arr, lo, high):
-        """ Recursively checks if key is in the array and modifies a
-        list key_flag, where key_flag[0] is a boolean : True if
-        key was in the list and false otherwise and key_flag[1] is an index
-        which is the index of the array if the key is in the array and if not
-        then it is the rank of the key """
-
-        """ check recuresively through binary search by the following
-        partition [lo mid-1] mid [mid+1, high]. For a full search
-        lo = 0, high = size-1
-        """
-        mid = lo + int((high - lo) / 2)
-
-        # base case
-        if high <= lo:
-            # we have an array of one element arr[lo]
-            # compare
-            if key < arr[lo]:
-                key_flag.append(False)
-                key_flag.append(lo)
-                return
-            elif key > arr[lo]:
-                key_flag.append(False)
-                key_flag.append(lo + 1)
-                return
+    def _check_key(self, key):
+        """ binary search for key in keys[0..size-1] by the following
+        partition [lo mid-1] mid [mid+1, high]. Returns a pair
+        (key_exists, rank), where rank is the index of the key if it is in
+        the array and if not then it is the number of keys smaller than
+        key, i.e the index where the key would be inserted.
+        """
+        arr = self._keys
+        lo = 0
+        high = self._size - 1
+        while lo <= high:
+            mid = lo + (high - lo) // 2
+            if key < arr[mid]:
+                high = mid - 1
+            elif key > arr[mid]:
+                lo = mid + 1
             else:
-                key_flag.append(True)
-                key_flag.append(lo)
-                return
-
-        if key < arr[mid]:
-            self._check_key(key_flag, key, arr, lo, mid - 1)
-        elif key > arr[mid]:
-            self._check_key(key_flag, key, arr, mid + 1, high)
-        else:
-            key_flag.append(True)
-            key_flag.append(mid)
-            return
+                return True, mid
+        return False, lo
 
     def _put(self, key, val):
         """ adds the key value pair. If key is in the ST, then update the
         value, otherwise add the key, value pair
         """
-        if self._size == 0:
-            self._keys[0] = key
-            self._vals[0] = val
-            self._size += 1
-            return
-
-        key_flag = []
-
-        self._check_key(key_flag, key, self._keys, 0, self._size - 1)
-
-        rank = key_flag[1]
-        key_exists = key_flag[0]
+        key_exists, rank = self._check_key(key)
 
         if key_exists:
             self._vals[rank] = val
@@ -197,22 +468,21 @@ class BinarySearchST(object):
             if len(self._keys) == self._size:
                 self._resize()
             # move over to insert the key, value pair
-            for k in range(self._size, rank, -1):
-                self._keys[k] = self._keys[k - 1]
-                self._vals[k] = self._vals[k - 1]
+            self._keys[rank + 1:self._size + 1] = self._keys[rank:self._size]
+            self._vals[rank + 1:self._size + 1] = self._vals[rank:self._size]
             # insert the key, value pair
             self._keys[rank] = key
             self._vals[rank] = val
             self._size += 1
+            self._numeric_keys = None
 
     def _get(self, key):
         """ gets the value associated with the key
         If key is not there, returns None.
         """
-        key_in_st = []
-        self._check_key(key_in_st, key, self._keys, 0, self._size - 1)
-        if key_in_st[0]:
-            return self._vals[key_in_st[1]]
+        key_exists, rank = self._check_key(key)
+        if key_exists:
+            return self._vals[rank]
         else:
             return None
 
@@ -226,25 +496,216 @@ class BinarySearchST(object):
         return self._get(key)
 
     def __contains__(self, key):
-        key_in_st = []
-        self._check_key(key_in_st, key, self._keys, 0, self._size - 1)
-        return key_in_st[0]
+        return self._check_key(key)[0]
 
-    def keys(self):
-        """ Returns keys in a queue """
-        queue_of_keys = Queue()
-        for indx in range(self._size):
-            queue_of_keys.enqueue(self._keys[indx])
-        return queue_of_keys
+    def rank(self, key):
+        """ Returns the number of keys in the ST smaller than key """
+        return self._check_key(key)[1]
 
-    def size(self):
-        """ Returns the size of ST """
-        return self._size
+    @classmethod
+    def from_sorted(cls, keys, vals):
+        """ Builds the ST in linear time from keys in strictly increasing
+        order and their values.
+        """
+        if len(keys) != len(vals):
+            raise IllegalArgument("keys and vals must have the same length")
+        st = cls()
+        n = len(keys)
+        if n == 0:
+            return st
+        arr_k = np.empty([n], dtype=object)
+        arr_v = np.empty([n], dtype=object)
+        arr_k[:] = list(keys)
+        arr_v[:] = list(vals)
+        if not np.all(arr_k[:-1] < arr_k[1:]):
+            raise IllegalArgument("keys must be in strictly increasing order")
+        st._keys = arr_k
+        st._vals = arr_v
+        st._size = n
+        return st
+
+    @classmethod
+    def from_items(cls, items):
+        """ Builds the ST from an iterable of (key, value) pairs in any
+        order. For duplicate keys the last value wins.
+        """
+        st = cls()
+        items = list(items)
+        st.put_many([item[0] for item in items], [item[1] for item in items])
+        return st
+
+    def put_many(self, keys, vals):
+        """ Adds a batch of key value pairs. The batch is sorted once and
+        merged with the keys of the ST in a single pass, so adding m keys to
+        an ST of size n costs O(m log m + n) instead of O(m n).
+        For duplicate keys in the batch the last value wins.
+        """
+        if len(keys) != len(vals):
+            raise IllegalArgument("keys and vals must have the same length")
+        for key in keys:
+            if not is_comparable(key):
+                raise NotComparable("key must be comparable : i.e must\
+                    have __lt__ and __eq__")
+        # stable sort, so the last of equal keys is the last in the batch
+        order = sorted(range(len(keys)), key=lambda indx: keys[indx])
+        last = []
+        for indx in order:
+            if last and keys[last[-1]] == keys[indx]:
+                last.pop()
+            last.append(indx)
+        m = len(last)
+        if m == 0:
+            return
+        batch_k = np.empty([m], dtype=object)
+        batch_v = np.empty([m], dtype=object)
+        batch_k[:] = [keys[indx] for indx in last]
+        batch_v[:] = [vals[indx] for indx in last]
+
+        n = self._size
+        st_keys = self._keys[:n].astype(object)
+        # position of each batch key among the keys of the ST
+        pos = np.searchsorted(st_keys, batch_k)
+        exists = np.zeros([m], dtype=bool)
+        if n > 0:
+            in_range = pos < n
+            exists[in_range] = st_keys[pos[in_range]] == batch_k[in_range]
+        self._vals[pos[exists]] = batch_v[exists]
+
+        new = ~exists
+        if np.any(new):
+            self._keys = np.insert(st_keys, pos[new], batch_k[new])
+            self._vals = np.insert(self._vals[:n], pos[new], batch_v[new])
+            self._size = len(self._keys)
+            self._numeric_keys = None
+
+    def get_many(self, keys):
+        """ Returns an array with the values of a batch of keys, None for
+        the keys that are not in the ST. If the keys of the ST and the
+        batch are numeric the search is done with np.searchsorted.
+        """
+        result = np.empty([len(keys)], dtype=object)
+        n = self._size
+        query = np.asarray(keys)
+        numeric = None
+        if n > 0 and query.dtype.kind in "biuf":
+            numeric = self._get_numeric_keys()
+        if numeric is not None:
+            pos = np.searchsorted(numeric, query)
+            found = pos < n
+            found[found] = numeric[pos[found]] == query[found]
+            result[found] = self._vals[pos[found]]
+        else:
+            for indx in range(len(keys)):
+                result[indx] = self._get(keys[indx])
+        return result
+
+    def save(self, path):
+        """ Saves the keys and values in the directory path as NumPy
+        arrays (numbers) or byte arenas (strings), without pickle.
+        """
+        _save_table(path, self._keys[:self._size].tolist(),
+                    self._vals[:self._size].tolist())
+
+    @classmethod
+    def load(cls, path, mmap=False):
+        """ Loads an ST saved with save(path). If mmap is True and the keys
+        are numbers, the key array is memory mapped (copy on write) instead
+        of read, until the first insertion of a new key.
+        """
+        keys = _load_array(path, "keys", mmap)
+        vals = _load_array(path, "vals")
+        st = cls()
+        if len(keys) == 0:
+            return st
+        if len(keys) != len(vals):
+            raise IllegalArgument("keys and vals must have the same length")
+        arr_v = np.empty([len(vals)], dtype=object)
+        arr_v[:] = vals if isinstance(vals, list) else vals.tolist()
+        if mmap and isinstance(keys, np.ndarray):
+            st._keys = keys
+        else:
+            st._keys = np.empty([len(keys)], dtype=object)
+            st._keys[:] = keys if isinstance(keys, list) else keys.tolist()
+        st._vals = arr_v
+        st._size = len(keys)
+        return st
+
+    def _get_numeric_keys(self):
+        """ Returns the keys as a numeric array, or None if the keys are not
+        numbers. Either result is cached until the next insertion, False
+        standing for keys that are not numbers.
+        """
+        if self._keys.dtype.kind in "biuf":
+            # memory mapped keys
+            return self._keys[:self._size]
+        if self._numeric_keys is None and self._size > 0:
+            numeric = np.array(self._keys[:self._size].tolist())
+            if numeric.dtype.kind in "biuf":
+                self._numeric_keys = numeric
+            else:
+                self._numeric_keys = False
+        if self._numeric_keys is False:
+            return None
+        return self._numeric_keys
+
+    def _range(self, lo, hi):
+        """ Returns the index range [start, stop) of the keys in [lo, hi].
+        A bound that is None is unbounded.
+        """
+        if lo is None:
+            start = 0
+        else:
+            start = self.rank(lo)
+        if hi is None:
+            stop = self._size
+        elif hi in self:
+            stop = self.rank(hi) + 1
+        else:
+            stop = self.rank(hi)
+        return start, max(start, stop)
+
+    def keys(self, lo=None, hi=None):
+        """ Returns a generator of the keys in [lo, hi] in sorted order,
+        all the keys if no bounds are given.
+        """
+        start, stop = self._range(lo, hi)
+        indx = start
+        while indx < stop:
+            yield self._keys[indx]
+            indx += 1
+
+    def values(self, lo=None, hi=None):
+        """ Returns a generator of the values of the keys in [lo, hi] """
+        start, stop = self._range(lo, hi)
+        indx = start
+        while indx < stop:
+            yield self._vals[indx]
+            indx += 1
+
+    def items(self, lo=None, hi=None):
+        """ Returns a generator of (key, value) pairs for the keys in
+        [lo, hi] in sorted order
+        """
+        start, stop = self._range(lo, hi)
+        indx = start
+        while indx < stop:
+            yield self._keys[indx], self._vals[indx]
+            indx += 1
+
+    def __iter__(self):
+        return self.keys()
+
+    def size(self, lo=None, hi=None):
+        """ Returns the size of ST, or the number of keys in [lo, hi] """
+        if lo is None and hi is None:
+            return self._size
+        start, stop = self._range(lo, hi)
+        return stop - start
 
 
 class BST(object):
     """Binary search tree using linked list. Balance is not guranteed,
-    use with caution. For a general balanced BST, use the BBST.
+    use with caution. For a general balanced BST, use the RedBlackBST.
     Definition : A BST is a binary tree where each node has a comparable
     key with the following property : a key in any node is larger than
     all the keys in its left subtree and smaller than all the keys in
@@ -252,6 +713,9 @@ class BST(object):
     a BST is :
     a) either empty
     b) node that points to 2 BST -> left and right with the above property.
+    All the operations walk the tree with loops (and an explicit stack for
+    the in order traversal), so the depth of the tree is not limited by
+    the recursion limit.
     """
 
     class _Node(object):
@@ -273,45 +737,67 @@ class BST(object):
         self._root = None
 
     def _put(self, put_node, key, val):
-        """ recursively put a key value pair according to the following recipie:
+        """ put a key value pair in the tree rooted at put_node and return
+        the root, according to the following recipie:
         a) if put_node is None, then create a node object at put_node and
         return it
-        b) else :
-        if key < key at put_node, call the function with put_node.left,
-        if key > key at put_node, call the function with put_node.right,
-        else update the put_node.val = val
+        b) else walk down from put_node remembering the path :
+        if key < key at the current node, go to the left subtree,
+        if key > key at the current node, go to the right subtree,
+        else update the val and return, no sizes change.
+        When we fall off the tree, attach a new node to the last node on
+        the path and add one to the size of every node on the path.
         """
         # write the base case first
         if put_node is None:
-            put_node = BST._Node(key, val, size=1)
-        elif key < put_node.key:
-            put_node.left = self._put(put_node.left, key, val)
-        elif key > put_node.key:
-            put_node.right = self._put(put_node.right, key, val)
+            return self._Node(key, val, size=1)
+
+        path = []
+        node = put_node
+        while node is not None:
+            path.append(node)
+            if key < node.key:
+                node = node.left
+            elif key > node.key:
+                node = node.right
+            else:
+                node.val = val
+                return put_node
+
+        parent = path[-1]
+        if key < parent.key:
+            parent.left = self._Node(key, val, size=1)
         else:
-            put_node.val = val
-        put_node.size = self._size(put_node.left) + \
-            self._size(put_node.right) + 1
+            parent.right = self._Node(key, val, size=1)
+        for node in path:
+            node.size += 1
         return put_node
 
     def _get(self, key, start_node):
-        """ returns the value associated with the key with a recursive
-        search. If key is not found, return None.
+        """ returns the value associated with the key. If key is not
+        found, return None.
         check if key is in the start node, if so return it. Else, if key is
         less than the key at the start_node check in the left subtree;
         otherwise check in the right subtree
         """
-
-        # base case
-        if start_node is None:
+        node = self._get_node(key, start_node)
+        if node is None:
             return None
+        return node.val
 
-        if key < start_node.key:
-            return self._get(key, start_node.left)
-        elif key > start_node.key:
-            return self._get(key, start_node.right)
-        else:
-            return start_node.val
+    def _get_node(self, key, start_node):
+        """ returns the node of the key below start_node, None if key is
+        not in that subtree
+        """
+        node = start_node
+        while node is not None:
+            if key < node.key:
+                node = node.left
+            elif key > node.key:
+                node = node.right
+            else:
+                return node
+        return None
 
     def _size(self, node):
         if node is None:
@@ -320,104 +806,258 @@ class BST(object):
             return node.size
 
     def _min(self, node):
-        """ recursively search left to find the min """
+        """ search left to find the min """
         if node is None:
             return None
-        if node.left is None:
-            return node.key
-        else:
-            return self._min(node.left)
+        while node.left is not None:
+            node = node.left
+        return node.key
 
     def _max(self, node):
-        """ recursively search right to find the max """
+        """ search right to find the max """
         if node is None:
             return None
-        if node.right is None:
-            return node.key
-        else:
-            return self._max(node.right)
+        while node.right is not None:
+            node = node.right
+        return node.key
 
     def _floor(self, key, node):
-        """ returns the largest key in the bst that is smaller or equal
-        than key. If node is None return None. If key is smaller than
-        key at node, then floor must be in left subtree. If key is larger
-        than the key at node, then floor could be in the right subtree
-        provided there is a smaller key. If not, floor is the node.
+        """ returns the node with the largest key in the bst that is
+        smaller or equal than key. If node is None return None. If key is
+        smaller than key at node, then floor must be in left subtree. If key
+        is larger than the key at node, then node is a candidate and the
+        floor could be in the right subtree provided there is a smaller key.
         """
-
-        if node is None:
-            return None
-        if key < node.key:
-            return self._floor(key, node.left)
-        if key > node.key:
-            temp = self._floor(key, node.right)
-            if temp is None:
-                return node
+        candidate = None
+        while node is not None:
+            if key < node.key:
+                node = node.left
+            elif key > node.key:
+                candidate = node
+                node = node.right
             else:
-                return temp
-        if key == node.key:
-            return node
+                return node
+        return candidate
 
     def _ceiling(self, key, node):
-        """ returns the smallest key in the bst that is larger or equal
-        than key. If node is None return None. If key is larger than
-        key at node, then floor must be in right subtree. If key is smaller
-        than the key at node, then ceiling could be in the left subtree
-        provided there is a larger key. If not, floor is the node.
+        """ returns the node with the smallest key in the bst that is
+        larger or equal than key. If node is None return None. If key is
+        larger than key at node, then ceiling must be in right subtree. If
+        key is smaller than the key at node, then node is a candidate and
+        the ceiling could be in the left subtree provided there is a larger
+        key.
         """
-        if node is None:
-            return None
-        if key > node.key:
-            return self._ceiling(key, node.right)
-        if key < node.key:
-            temp = self._ceiling(key, node.left)
-            if temp is None:
-                return node
+        candidate = None
+        while node is not None:
+            if key > node.key:
+                node = node.right
+            elif key < node.key:
+                candidate = node
+                node = node.left
             else:
-                return temp
-        if key == node.key:
-            return node
+                return node
+        return candidate
 
     def _select(self, rank, node):
-        """ returns the key with the given rank, that is the the
+        """ returns the node with the given rank, that is the the
         key with rank number of keys lower than it """
-
-        if node is None:
-            return None
-        elif rank < self._size(node.left):
-            return self._select(rank, node.left)
-        elif rank > self._size(node.left):
+        while node is not None:
             size_left = self._size(node.left)
-            return self._select(rank - (size_left + 1), node.right)
-        else:
-            return node
+            if rank < size_left:
+                node = node.left
+            elif rank > size_left:
+                rank -= size_left + 1
+                node = node.right
+            else:
+                return node
+        return None
 
     def _rank(self, key, node):
         """ return the rank of the key i.e the number of keys lesser than
         it in the bst """
-
-        if node is None:
-            return 0
-        elif key < node.key:
-            return self._rank(key, node.left)
-        elif key > node.key:
-            return self._rank(key, node.right) + 1 + self._size(node.left)
+        rank = 0
+        while node is not None:
+            if key < node.key:
+                node = node.left
+            elif key > node.key:
+                rank += 1 + self._size(node.left)
+                node = node.right
+            else:
+                return rank + self._size(node.left)
+        return rank
+
+    def _nodes(self, node, lo=None, hi=None):
+        """ generator over the nodes of the tree rooted at node with keys
+        in [lo, hi] in sorted order. Uses an explicit stack of the left
+        spine instead of recursion. Subtrees with keys smaller than lo are
+        never pushed and the walk stops at the first key larger than hi,
+        so only the relevant part of the tree is visited.
+        A bound that is None is unbounded.
+        """
+        stack = []
+        while stack or node is not None:
+            if node is not None:
+                if lo is not None and node.key < lo:
+                    # node and its left subtree are out of range
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            else:
+                node = stack.pop()
+                if hi is not None and node.key > hi:
+                    return
+                yield node
+                node = node.right
+
+    def _replace_child(self, parent, node, new_node):
+        """ make new_node take the place of node, the child of parent """
+        if parent is None:
+            self._root = new_node
+        elif parent.left is node:
+            parent.left = new_node
         else:
-            return self._size(node.left)
+            parent.right = new_node
 
-    def _keys(self, iterable, node):
+    def delete_min(self):
+        """ removes the smallest key and its value: go left until the left
+        link is null and replace that node by its right link
+        """
+        if self._root is None:
+            return
+        path = []
+        node = self._root
+        while node.left is not None:
+            path.append(node)
+            node = node.left
+        for parent in path:
+            parent.size -= 1
+        self._replace_child(path[-1] if path else None, node, node.right)
+
+    def delete_max(self):
+        """ removes the largest key and its value: go right until the
+        right link is null and replace that node by its left link
+        """
+        if self._root is None:
+            return
+        path = []
+        node = self._root
+        while node.right is not None:
+            path.append(node)
+            node = node.right
+        for parent in path:
+            parent.size -= 1
+        self._replace_child(path[-1] if path else None, node, node.left)
+
+    def delete(self, key):
+        """ removes the key and its value (Hibbard deletion). A node with
+        at most one child is replaced by that child. A node with two
+        children is replaced by its successor, the min of its right
+        subtree, which is first removed from there. The size of every
+        node on the path to the removed node is decremented.
+        """
+        path = []
+        node = self._root
+        while node is not None:
+            if key < node.key:
+                path.append(node)
+                node = node.left
+            elif key > node.key:
+                path.append(node)
+                node = node.right
+            else:
+                break
         if node is None:
             return
-        self._keys(iterable, node.left)
-        iterable.enqueue(node.key)
-        self._keys(iterable, node.right)
 
-    def __contains__(self, key):
-        """ checks if key is in the search tree """
-        if self._get(key, self._root) is None:
-            return False
+        if node.left is None:
+            replacement = node.right
+        elif node.right is None:
+            replacement = node.left
         else:
-            return True
+            successor_path = []
+            successor = node.right
+            while successor.left is not None:
+                successor_path.append(successor)
+                successor = successor.left
+            if successor_path:
+                # take the successor out of the right subtree
+                successor_path[-1].left = successor.right
+                for parent in successor_path:
+                    parent.size -= 1
+                successor.right = node.right
+            successor.left = node.left
+            successor.size = node.size - 1
+            replacement = successor
+
+        for parent in path:
+            parent.size -= 1
+        self._replace_child(path[-1] if path else None, node, replacement)
+
+    @classmethod
+    def from_sorted(cls, keys, vals):
+        """ Builds the tree in linear time from keys in strictly increasing
+        order and their values. The tree is as balanced as possible, with
+        correct subtree sizes.
+        """
+        keys = list(keys)
+        vals = list(vals)
+        if len(keys) != len(vals):
+            raise IllegalArgument("keys and vals must have the same length")
+        for indx in range(1, len(keys)):
+            if not keys[indx - 1] < keys[indx]:
+                raise IllegalArgument("keys must be in strictly increasing\
+                    order")
+        st = cls()
+        st._root = st._build_sorted(keys, vals)
+        return st
+
+    def _build_sorted(self, keys, vals):
+        return self._build_range(keys, vals, 0, len(keys))
+
+    def save(self, path):
+        """ Saves the keys and values in the directory path as NumPy
+        arrays (numbers) or byte arenas (strings), without pickle.
+        """
+        items = list(self.items())
+        _save_table(path, [item[0] for item in items],
+                    [item[1] for item in items])
+
+    @classmethod
+    def load(cls, path):
+        """ Loads a tree saved with save(path), built with from_sorted in
+        linear time """
+        keys = _load_array(path, "keys")
+        vals = _load_array(path, "vals")
+        if isinstance(keys, np.ndarray):
+            keys = keys.tolist()
+        if isinstance(vals, np.ndarray):
+            vals = vals.tolist()
+        return cls.from_sorted(keys, vals)
+
+    def _build_range(self, keys, vals, lo, hi):
+        """ returns the root of a tree built from keys[lo:hi] with the
+        median as root and the two halves as subtrees """
+        if hi <= lo:
+            return None
+        mid = (lo + hi) // 2
+        return self._Node(keys[mid], vals[mid],
+                          self._build_range(keys, vals, lo, mid),
+                          self._build_range(keys, vals, mid + 1, hi),
+                          hi - lo)
+
+    def pop_range(self, lo=None, hi=None):
+        """ removes the keys in [lo, hi] and returns a list of the removed
+        (key, value) pairs in sorted order
+        """
+        removed = list(self.items(lo, hi))
+        for key, val in removed:
+            self.delete(key)
+        return removed
+
+    def __contains__(self, key):
+        """ checks if key is in the search tree, whatever its value """
+        return self._get_node(key, self._root) is not None
 
     def __setitem__(self, key, val):
         if not is_comparable(key):
@@ -427,8 +1067,24 @@ class BST(object):
     def __getitem__(self, key):
         return self._get(key, self._root)
 
-    def size(self):
-        return self._size(self._root)
+    def size(self, lo=None, hi=None):
+        """ returns the number of keys in the bst, or the number of keys
+        in [lo, hi] computed from their ranks. A bound that is None is
+        unbounded.
+        """
+        if lo is None and hi is None:
+            return self._size(self._root)
+        if lo is None:
+            lo_rank = 0
+        else:
+            lo_rank = self.rank(lo)
+        if hi is None:
+            hi_rank = self._size(self._root)
+        elif hi in self:
+            hi_rank = self.rank(hi) + 1
+        else:
+            hi_rank = self.rank(hi)
+        return max(0, hi_rank - lo_rank)
 
     def is_empty(self):
         return self.size() == 0
@@ -473,11 +1129,2122 @@ class BST(object):
         """ returns the rank of the given key """
         return self._rank(key, self._root)
 
-    def keys(self):
-        """ returns a queue of keys in sorted order """
-        queue_of_keys = Queue()
-        self._keys(queue_of_keys, self._root)
-        return queue_of_keys
+    def keys(self, lo=None, hi=None):
+        """ returns a generator of the keys in [lo, hi] in sorted order,
+        all the keys if no bounds are given.
+        """
+        for node in self._nodes(self._root, lo, hi):
+            yield node.key
+
+    def values(self, lo=None, hi=None):
+        """ returns a generator of the values of the keys in [lo, hi] in
+        sorted order of the keys
+        """
+        for node in self._nodes(self._root, lo, hi):
+            yield node.val
+
+    def items(self, lo=None, hi=None):
+        """ returns a generator of (key, value) pairs for the keys in
+        [lo, hi] in sorted order
+        """
+        for node in self._nodes(self._root, lo, hi):
+            yield node.key, node.val
+
+    def __iter__(self):
+        """ iterate over the keys in sorted order """
+        return self.keys()
+
+
+
+
+class RedBlackBST(BST):
+    """Left leaning red black BST. A BST that represents a 2-3 tree,
+    where a 3-node is a pair of nodes joined by a red link that leans
+    left. The tree is kept in perfect black balance: every path from the
+    root to a null link has the same number of black links. Hence the
+    height is at most 2 lg n and put, get, delete, floor, ceiling, select
+    and rank are guaranteed to be logarithmic, even for keys that are
+    inserted in sorted order.
+
+    arguments: None
+    attributes: same as BST, where delete(key), delete_min() and
+    delete_max() keep the tree balanced.
+    """
+
+    RED = True
+    BLACK = False
+
+    class _Node(BST._Node):
+        """inner node class of the BST, with the color of the link
+        from its parent.
+        """
+
+        def __init__(self, key, val, left=None, right=None, size=0,
+                     color=True):
+            super(RedBlackBST._Node, self).__init__(key, val, left, right,
+                                                    size)
+            self.color = color
+
+    def _is_red(self, node):
+        if node is None:
+            return False
+        return node.color == RedBlackBST.RED
+
+    def _rotate_left(self, h):
+        """ make a right leaning red link lean left """
+        x = h.right
+        h.right = x.left
+        x.left = h
+        x.color = h.color
+        h.color = RedBlackBST.RED
+        x.size = h.size
+        h.size = self._size(h.left) + self._size(h.right) + 1
+        return x
+
+    def _rotate_right(self, h):
+        """ make a left leaning red link lean right """
+        x = h.left
+        h.left = x.right
+        x.right = h
+        x.color = h.color
+        h.color = RedBlackBST.RED
+        x.size = h.size
+        h.size = self._size(h.left) + self._size(h.right) + 1
+        return x
+
+    def _flip_colors(self, h):
+        """ flip the colors of h and its two children. Splits a temporary
+        4-node on insert and merges siblings into a 4-node on delete.
+        """
+        h.color = not h.color
+        h.left.color = not h.left.color
+        h.right.color = not h.right.color
+
+    def _balance(self, h):
+        """ restore the red black invariant on the way up the tree """
+        if self._is_red(h.right) and not self._is_red(h.left):
+            h = self._rotate_left(h)
+        if self._is_red(h.left) and self._is_red(h.left.left):
+            h = self._rotate_right(h)
+        if self._is_red(h.left) and self._is_red(h.right):
+            self._flip_colors(h)
+        h.size = self._size(h.left) + self._size(h.right) + 1
+        return h
+
+    def _put(self, put_node, key, val):
+        """ recursively put a key value pair as in BST, new nodes are
+        attached with a red link and the invariant is restored with
+        rotations and color flips on the way back up.
+        """
+        if put_node is None:
+            return RedBlackBST._Node(key, val, size=1,
+                                     color=RedBlackBST.RED)
+        if key < put_node.key:
+            put_node.left = self._put(put_node.left, key, val)
+        elif key > put_node.key:
+            put_node.right = self._put(put_node.right, key, val)
+        else:
+            put_node.val = val
+
+        return self._balance(put_node)
+
+    def __setitem__(self, key, val):
+        if not is_comparable(key):
+            raise NotComparable("key is not comparable")
+        self._root = self._put(self._root, key, val)
+        self._root.color = RedBlackBST.BLACK
+
+    def _move_red_left(self, h):
+        """ h is red and both h.left and h.left.left are black, make
+        h.left or one of its children red.
+        """
+        self._flip_colors(h)
+        if self._is_red(h.right.left):
+            h.right = self._rotate_right(h.right)
+            h = self._rotate_left(h)
+            self._flip_colors(h)
+        return h
+
+    def _move_red_right(self, h):
+        """ h is red and both h.right and h.right.left are black, make
+        h.right or one of its children red.
+        """
+        self._flip_colors(h)
+        if self._is_red(h.left.left):
+            h = self._rotate_right(h)
+            self._flip_colors(h)
+        return h
+
+    def _delete_min(self, h):
+        if h.left is None:
+            return None
+        if not self._is_red(h.left) and not self._is_red(h.left.left):
+            h = self._move_red_left(h)
+        h.left = self._delete_min(h.left)
+        return self._balance(h)
+
+    def _delete_max(self, h):
+        if self._is_red(h.left):
+            h = self._rotate_right(h)
+        if h.right is None:
+            return None
+        if not self._is_red(h.right) and not self._is_red(h.right.left):
+            h = self._move_red_right(h)
+        h.right = self._delete_max(h.right)
+        return self._balance(h)
+
+    def _delete(self, h, key):
+        """ delete the key from the tree rooted at h, keeping a red link
+        on the search path so that the key is never removed from a 2-node.
+        """
+        if key < h.key:
+            if not self._is_red(h.left) and not self._is_red(h.left.left):
+                h = self._move_red_left(h)
+            h.left = self._delete(h.left, key)
+        else:
+            if self._is_red(h.left):
+                h = self._rotate_right(h)
+            if key == h.key and h.right is None:
+                return None
+            if not self._is_red(h.right) and not self._is_red(h.right.left):
+                h = self._move_red_right(h)
+            if key == h.key:
+                # replace h with its successor
+                successor = h.right
+                while successor.left is not None:
+                    successor = successor.left
+                h.key = successor.key
+                h.val = successor.val
+                h.right = self._delete_min(h.right)
+            else:
+                h.right = self._delete(h.right, key)
+        return self._balance(h)
+
+    def _prepare_root(self):
+        """ if both children of the root are black, make the root red """
+        if not self._is_red(self._root.left) and \
+                not self._is_red(self._root.right):
+            self._root.color = RedBlackBST.RED
+
+    def delete_min(self):
+        """ removes the smallest key and its value """
+        if self.is_empty():
+            return
+        self._prepare_root()
+        self._root = self._delete_min(self._root)
+        if not self.is_empty():
+            self._root.color = RedBlackBST.BLACK
+
+    def delete_max(self):
+        """ removes the largest key and its value """
+        if self.is_empty():
+            return
+        self._prepare_root()
+        self._root = self._delete_max(self._root)
+        if not self.is_empty():
+            self._root.color = RedBlackBST.BLACK
+
+    def delete(self, key):
+        """ removes the key and its value, if key is in the tree """
+        if self._get_node(key, self._root) is None:
+            return
+        self._prepare_root()
+        self._root = self._delete(self._root, key)
+        if not self.is_empty():
+            self._root.color = RedBlackBST.BLACK
+
+    def _build_sorted(self, keys, vals):
+        """ builds the 2-3 tree of keys with all the leaves at depth h,
+        h being the largest black height with 2^h - 1 <= n """
+        n = len(keys)
+        height = 0
+        while 2 ** (height + 1) - 1 <= n:
+            height += 1
+        return self._build_black(keys, vals, 0, n, height)
+
+    def _build_black(self, keys, vals, lo, hi, height):
+        """ returns the root (black) of a red black tree of black height
+        height built from keys[lo:hi]. A tree of black height h holds
+        between 2^h - 1 keys (all 2-nodes) and 3^h - 1 keys (all
+        3-nodes). The root is a 2-node if the n - 1 other keys fit in two
+        subtrees of black height h - 1, otherwise it is a 3-node: two keys,
+        the smaller one a red left child, and three subtrees.
+        """
+        n = hi - lo
+        if height == 0:
+            return None
+        max_child = 3 ** (height - 1) - 1
+        if n - 1 <= 2 * max_child:
+            mid = lo + n // 2
+            left = self._build_black(keys, vals, lo, mid, height - 1)
+            right = self._build_black(keys, vals, mid + 1, hi, height - 1)
+            return RedBlackBST._Node(keys[mid], vals[mid], left, right, n,
+                                     RedBlackBST.BLACK)
+        rest = n - 2
+        first = lo + rest // 3 + (1 if rest % 3 > 0 else 0)
+        second = first + 1 + rest // 3 + (1 if rest % 3 > 1 else 0)
+        red = RedBlackBST._Node(
+            keys[first], vals[first],
+            self._build_black(keys, vals, lo, first, height - 1),
+            self._build_black(keys, vals, first + 1, second, height - 1),
+            second - lo, RedBlackBST.RED)
+        right = self._build_black(keys, vals, second + 1, hi, height - 1)
+        return RedBlackBST._Node(keys[second], vals[second], red, right, n,
+                                 RedBlackBST.BLACK)
+
+    def height(self):
+        """ returns the height of the tree, a tree with one node has
+        height 0.
+        """
+        height = -1
+        level = [self._root] if self._root is not None else []
+        while level:
+            height += 1
+            next_level = []
+            for node in level:
+                if node.left is not None:
+                    next_level.append(node.left)
+                if node.right is not None:
+                    next_level.append(node.right)
+            level = next_level
+        return height
+
+
+class BTreeST(object):
+    """B-tree ordered symbol table stored in fixed size pages of a memory
+    mapped file, for key sets that do not fit in memory.
+    Every page holds up to order entries. A leaf entry is a key and its
+    value, an internal entry is the smallest key of a child page, the
+    page number of the child and the number of keys below it (used by
+    rank and select). All leaves are at the same depth, so a search reads
+    log_order(n) pages.
+    Pages are read through a LRU page cache of cache_size pages, modified
+    pages are written back when they are evicted or on flush(). The file
+    starts with a header page (root page, height, size, number of pages),
+    so reopening the file gives back the table without rebuilding it.
+    Keys and values have fixed size numeric dtypes; a key or value that
+    its dtype cannot hold exactly (such as 5.5 for "i8") raises
+    IllegalArgument and leaves the table unchanged.
+    Don't modify the table while iterating over it.
+    Modified pages and the header only reach the file on flush() or
+    close(), so close() is required (or use "with BTreeST(path) as st:");
+    a table dropped without it reopens in the state of the last flush.
+
+    arguments: path            -> file of the table, created if needed
+               order=64        -> max number of entries in a page (even)
+               key_dtype="i8"  -> numpy dtype of the keys
+               val_dtype="f8"  -> numpy dtype of the values
+               cache_size=256  -> number of pages kept in memory
+    attributes:
+    1) __setitem__(key, value) -> adds key,value pair to the ST.
+    2) __getitem__(key)        -> returns value associated with the key.
+    3) __contains__(key)       -> checks to see if key is in the ST.
+    4) size(lo, hi)            -> size of ST or number of keys in [lo, hi].
+    5) min(), max()            -> smallest and largest key.
+    6) floor(key), ceiling(key)-> largest key <= key, smallest key >= key.
+    7) select(rank), rank(key) -> key of given rank, number of keys < key.
+    8) keys(lo, hi)            -> generator of the keys in [lo, hi].
+    9) flush(), close()        -> write the modified pages to the file.
+    """
+
+    MAGIC = b"ALGODSBT"
+
+    class _Page(object):
+        """in memory copy of a page"""
+
+        def __init__(self, pid, n, leaf, keys, vals, next, count):
+            self.pid = pid
+            self.n = n
+            self.leaf = leaf
+            self.keys = keys
+            self.vals = vals
+            self.next = next
+            self.count = count
+            self.dirty = False
+
+    def __init__(self, path, order=None, key_dtype=None, val_dtype=None,
+                 cache_size=256):
+        if cache_size < 1:
+            raise IllegalArgument("cache_size must be positive")
+        self._path = path
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._header_dtype = np.dtype([("magic", "S8"), ("order", "<i8"),
+                                       ("key_dtype", "S8"),
+                                       ("val_dtype", "S8"), ("root", "<i8"),
+                                       ("height", "<i8"), ("size", "<i8"),
+                                       ("pages", "<i8")])
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            header = np.fromfile(path, dtype=self._header_dtype, count=1)[0]
+            if header["magic"] != BTreeST.MAGIC:
+                raise IllegalArgument(path + " is not a BTreeST file")
+            stored = (int(header["order"]),
+                      np.dtype(header["key_dtype"].decode()),
+                      np.dtype(header["val_dtype"].decode()))
+            if (order is not None and order != stored[0]) or \
+                    (key_dtype is not None and
+                     np.dtype(key_dtype) != stored[1]) or \
+                    (val_dtype is not None and
+                     np.dtype(val_dtype) != stored[2]):
+                raise IllegalArgument("arguments do not match the file")
+            self._setup(*stored)
+            self._root = int(header["root"])
+            self._height = int(header["height"])
+            self._n = int(header["size"])
+            self._pages = int(header["pages"])
+            self._map(os.path.getsize(path) // self._page_size)
+        else:
+            self._setup(64 if order is None else order,
+                        np.dtype("i8" if key_dtype is None else key_dtype),
+                        np.dtype("f8" if val_dtype is None else val_dtype))
+            self._mm = None
+            self._map(16)
+            self._pages = 1
+            self._height = 0
+            self._n = 0
+            self._root = self._new_page(leaf=True).pid
+            self.flush()
+
+    def _setup(self, order, key_dtype, val_dtype):
+        if order < 4 or order % 2 != 0:
+            raise IllegalArgument("order must be even and at least 4")
+        if key_dtype.kind not in "biuf" or val_dtype.kind not in "biuf":
+            raise IllegalArgument("keys and values must be numeric")
+        self._order = order
+        self._key_dtype = key_dtype
+        self._val_dtype = val_dtype
+        self._page_dtype = np.dtype([("n", "<i8"), ("leaf", "<i8"),
+                                     ("keys", key_dtype, (order,)),
+                                     ("vals", val_dtype, (order,)),
+                                     ("next", "<i8", (order,)),
+                                     ("count", "<i8", (order,))])
+        self._page_size = max(self._page_dtype.itemsize,
+                              self._header_dtype.itemsize)
+
+    def _map(self, capacity):
+        """ (re)map the file with room for capacity pages """
+        if self._mm_is_open():
+            self._mm.flush()
+            del self._mm
+        size = capacity * self._page_size
+        with open(self._path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._mm = np.memmap(self._path, dtype=np.uint8, mode="r+",
+                             shape=(size,))
+        self._capacity = capacity
+
+    def _mm_is_open(self):
+        return getattr(self, "_mm", None) is not None
+
+    def _record(self, pid):
+        """ structured view of page pid in the memory map """
+        start = pid * self._page_size
+        return self._mm[start:start + self._page_dtype.itemsize].view(
+            self._page_dtype)
+
+    def _page(self, pid):
+        """ returns page pid from the cache, reading it if needed """
+        page = self._cache.pop(pid, None)
+        if page is None:
+            record = self._record(pid)
+            page = BTreeST._Page(pid, int(record["n"][0]),
+                                 bool(record["leaf"][0]),
+                                 record["keys"][0].copy(),
+                                 record["vals"][0].copy(),
+                                 record["next"][0].copy(),
+                                 record["count"][0].copy())
+        self._cache[pid] = page
+        self._evict()
+        return page
+
+    def _mark_dirty(self, page):
+        """ page was modified, make sure it is (back) in the cache """
+        page.dirty = True
+        self._cache.pop(page.pid, None)
+        self._cache[page.pid] = page
+        self._evict()
+
+    def _evict(self):
+        while len(self._cache) > self._cache_size:
+            pid, page = self._cache.popitem(last=False)
+            if page.dirty:
+                self._write_page(page)
+
+    def _write_page(self, page):
+        record = self._record(page.pid)
+        record["n"] = page.n
+        record["leaf"] = page.leaf
+        record["keys"][0] = page.keys
+        record["vals"][0] = page.vals
+        record["next"][0] = page.next
+        record["count"][0] = page.count
+        page.dirty = False
+
+    def _new_page(self, leaf):
+        pid = self._pages
+        self._pages += 1
+        if pid >= self._capacity:
+            self._map(2 * self._capacity)
+        order = self._order
+        page = BTreeST._Page(pid, 0, leaf,
+                             np.zeros([order], dtype=self._key_dtype),
+                             np.zeros([order], dtype=self._val_dtype),
+                             np.zeros([order], dtype=np.int64),
+                             np.zeros([order], dtype=np.int64))
+        self._mark_dirty(page)
+        return page
+
+    def flush(self):
+        """ write the modified pages and the header to the file """
+        for page in self._cache.values():
+            if page.dirty:
+                self._write_page(page)
+        header = self._mm[:self._header_dtype.itemsize].view(
+            self._header_dtype)
+        header["magic"] = BTreeST.MAGIC
+        header["order"] = self._order
+        header["key_dtype"] = self._key_dtype.str.encode()
+        header["val_dtype"] = self._val_dtype.str.encode()
+        header["root"] = self._root
+        header["height"] = self._height
+        header["size"] = self._n
+        header["pages"] = self._pages
+        self._mm.flush()
+
+    def close(self):
+        """ flush and unmap the file """
+        if self._mm_is_open():
+            self.flush()
+            del self._mm
+            self._mm = None
+            self._cache = OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _total(self, page):
+        """ number of keys below page """
+        if page.leaf:
+            return page.n
+        return int(page.count[:page.n].sum())
+
+    def _child(self, page, key):
+        """ index of the child of an internal page that may hold key, the
+        last child whose smallest key is <= key
+        """
+        return int(np.searchsorted(page.keys[1:page.n], key, side="right"))
+
+    def _split(self, page):
+        """ move the upper half of a full page to a new page """
+        half = self._order // 2
+        new_page = self._new_page(page.leaf)
+        new_page.n = half
+        new_page.keys[:half] = page.keys[half:]
+        new_page.vals[:half] = page.vals[half:]
+        new_page.next[:half] = page.next[half:]
+        new_page.count[:half] = page.count[half:]
+        page.n = half
+        self._mark_dirty(page)
+        self._mark_dirty(new_page)
+        return new_page
+
+    def _insert(self, pid, key, val, height):
+        """ insert into the subtree of page pid. Returns the page split off
+        from it (or None) and whether a new key was added.
+        """
+        page = self._page(pid)
+        n = page.n
+        if height == 0:
+            j = int(np.searchsorted(page.keys[:n], key))
+            if j < n and page.keys[j] == key:
+                page.vals[j] = val
+                self._mark_dirty(page)
+                return None, False
+            page.keys[j + 1:n + 1] = page.keys[j:n]
+            page.vals[j + 1:n + 1] = page.vals[j:n]
+            page.keys[j] = key
+            page.vals[j] = val
+        else:
+            j = self._child(page, key)
+            child_pid = int(page.next[j])
+            split, added = self._insert(child_pid, key, val, height - 1)
+            if added:
+                page.count[j] += 1
+            if split is None:
+                if added:
+                    self._mark_dirty(page)
+                return None, added
+            page.count[j] = self._total(self._page(child_pid))
+            j += 1
+            page.keys[j + 1:n + 1] = page.keys[j:n]
+            page.next[j + 1:n + 1] = page.next[j:n]
+            page.count[j + 1:n + 1] = page.count[j:n]
+            page.keys[j] = split.keys[0]
+            page.next[j] = split.pid
+            page.count[j] = self._total(split)
+        page.n += 1
+        self._mark_dirty(page)
+        if page.n < self._order:
+            return None, True
+        return self._split(page), True
+
+    @staticmethod
+    def _convert(item, dtype, name):
+        """ item converted to dtype, which must hold it exactly (a NaN
+        value is kept as NaN)
+        """
+        try:
+            converted = dtype.type(item)
+        except (TypeError, ValueError, OverflowError):
+            raise IllegalArgument(name + " does not fit the " + name +
+                                  " dtype")
+        if converted != item and not (converted != converted and
+                                      item != item):
+            raise IllegalArgument(name + " does not fit the " + name +
+                                  " dtype")
+        return converted
+
+    def _check_key(self, key):
+        """ key converted to the key dtype, which must hold it exactly """
+        key = self._convert(key, self._key_dtype, "key")
+        if key != key:
+            raise IllegalArgument("key must not be NaN")
+        return key
+
+    def __setitem__(self, key, val):
+        # convert both before a page is modified
+        key = self._check_key(key)
+        val = self._convert(val, self._val_dtype, "value")
+        split, added = self._insert(self._root, key, val, self._height)
+        if added:
+            self._n += 1
+        if split is not None:
+            old_root = self._page(self._root)
+            root = self._new_page(leaf=False)
+            root.n = 2
+            root.keys[0] = old_root.keys[0]
+            root.next[0] = old_root.pid
+            root.count[0] = self._total(old_root)
+            root.keys[1] = split.keys[0]
+            root.next[1] = split.pid
+            root.count[1] = self._total(split)
+            self._root = root.pid
+            self._height += 1
+
+    def __getitem__(self, key):
+        key = self._check_key(key)
+        page = self._page(self._root)
+        for level in range(self._height):
+            page = self._page(int(page.next[self._child(page, key)]))
+        j = int(np.searchsorted(page.keys[:page.n], key))
+        if j < page.n and page.keys[j] == key:
+            return page.vals[j].item()
+        return None
+
+    def __contains__(self, key):
+        rank = self.rank(key)
+        return rank < self._n and self.select(rank) == key
+
+    def rank(self, key):
+        """ returns the number of keys smaller than key """
+        rank = 0
+        page = self._page(self._root)
+        for level in range(self._height):
+            j = self._child(page, key)
+            rank += int(page.count[:j].sum())
+            page = self._page(int(page.next[j]))
+        return rank + int(np.searchsorted(page.keys[:page.n], key))
+
+    def select(self, rank):
+        """ returns the key of given rank """
+        if rank < 0 or rank >= self._n:
+            return None
+        page = self._page(self._root)
+        for level in range(self._height):
+            j = 0
+            while rank >= page.count[j]:
+                rank -= int(page.count[j])
+                j += 1
+            page = self._page(int(page.next[j]))
+        return page.keys[rank].item()
+
+    def size(self, lo=None, hi=None):
+        """ returns the number of keys, or the number of keys in [lo, hi] """
+        if lo is None and hi is None:
+            return self._n
+        lo_rank = 0 if lo is None else self.rank(lo)
+        if hi is None:
+            hi_rank = self._n
+        elif hi in self:
+            hi_rank = self.rank(hi) + 1
+        else:
+            hi_rank = self.rank(hi)
+        return max(0, hi_rank - lo_rank)
+
+    def is_empty(self):
+        return self._n == 0
+
+    def min(self):
+        return self.select(0)
+
+    def max(self):
+        return self.select(self._n - 1)
 
+    def floor(self, key):
+        """ returns the largest key smaller than or equal to key """
+        if key in self:
+            return key
+        return self.select(self.rank(key) - 1)
+
+    def ceiling(self, key):
+        """ returns the smallest key larger than or equal to key """
+        return self.select(self.rank(key))
 
+    def _leaf_entries(self, lo, hi):
+        """ generator of (page, index) of the leaf entries with keys in
+        [lo, hi], walking the pages with an explicit stack
+        """
+        stack = [(self._root, self._height)]
+        while stack:
+            pid, height = stack.pop()
+            page = self._page(pid)
+            if height == 0:
+                start = 0
+                if lo is not None:
+                    start = int(np.searchsorted(page.keys[:page.n], lo))
+                for j in range(start, page.n):
+                    if hi is not None and page.keys[j] > hi:
+                        return
+                    yield page, j
+                continue
+            start = 0
+            if lo is not None:
+                start = self._child(page, lo)
+            stop = page.n
+            if hi is not None:
+                stop = self._child(page, hi) + 1
+            for j in range(stop - 1, start - 1, -1):
+                stack.append((int(page.next[j]), height - 1))
+
+    def keys(self, lo=None, hi=None):
+        """ returns a generator of the keys in [lo, hi] in sorted order """
+        for page, j in self._leaf_entries(lo, hi):
+            yield page.keys[j].item()
+
+    def values(self, lo=None, hi=None):
+        for page, j in self._leaf_entries(lo, hi):
+            yield page.vals[j].item()
+
+    def items(self, lo=None, hi=None):
+        for page, j in self._leaf_entries(lo, hi):
+            yield page.keys[j].item(), page.vals[j].item()
+
+    def __iter__(self):
+        return self.keys()
+
+
+class TrieST(object):
+    """R-way trie symbol table for string keys. Each node has a value
+    and, once it has a child, a dict of links from the characters to the
+    children. The keys are not compared at the nodes, a search examines
+    one node per character of the key, and prefix queries only visit the
+    subtrie of the prefix. Nodes use __slots__ and only store the links
+    they have, instead of an array of radix links per node.
+    The value None is the absence of a value, thus st[key] = None removes
+    the key.
+
+    arguments: radix=256 -> size of the alphabet: characters with
+                            ord(c) >= radix are rejected. It only checks
+                            the keys, the links do not depend on it.
+    attributes:
+    1) __setitem__(key, value)   -> adds key,value pair to the ST.
+    2) __getitem__(key)          -> returns value associated with the key.
+    3) __contains__(key)         -> checks to see if key is in the ST.
+    4) delete(key)               -> removes the key from the ST.
+    5) size()                    -> get size of ST.
+    6) keys()                    -> generator of the keys in sorted order.
+    7) keys_with_prefix(prefix)  -> generator of the keys with the prefix.
+    8) keys_that_match(pattern)  -> keys matching pattern, '.' is a wildcard.
+    9) longest_prefix_of(query)  -> longest key that is a prefix of query.
+    """
 
+    class _Node(object):
+        """inner node class"""
+        __slots__ = ("val", "next")
+
+        def __init__(self):
+            self.val = None
+            self.next = None
+
+    def __init__(self, radix=256):
+        self._radix = radix
+        self._root = TrieST._Node()
+        self._size = 0
+
+    def _index(self, c):
+        indx = ord(c)
+        if indx >= self._radix:
+            raise IllegalArgument("character out of the alphabet: " + c)
+        return indx
+
+    def _get_node(self, key):
+        """ returns the node of key, None if there is no such node """
+        node = self._root
+        for c in key:
+            self._index(c)
+            if node.next is None:
+                return None
+            node = node.next.get(c)
+            if node is None:
+                return None
+        return node
+
+    def __setitem__(self, key, val):
+        if val is None:
+            self.delete(key)
+            return
+        node = self._root
+        for c in key:
+            self._index(c)
+            if node.next is None:
+                node.next = {}
+            child = node.next.get(c)
+            if child is None:
+                child = node.next[c] = TrieST._Node()
+            node = child
+        if node.val is None:
+            self._size += 1
+        node.val = val
+
+    def __getitem__(self, key):
+        node = self._get_node(key)
+        if node is None:
+            return None
+        return node.val
+
+    def __contains__(self, key):
+        return self[key] is not None
+
+    def delete(self, key):
+        """ removes the key and its value, and the nodes that no longer
+        lead to a key
+        """
+        path = [self._root]
+        for c in key:
+            node = path[-1]
+            if node.next is None or c not in node.next:
+                return
+            path.append(node.next[c])
+        if path[-1].val is None:
+            return
+        path[-1].val = None
+        self._size -= 1
+        # prune the nodes without value and without children
+        for depth in range(len(key), 0, -1):
+            node = path[depth]
+            if node.val is not None or node.next is not None:
+                return
+            parent = path[depth - 1]
+            del parent.next[key[depth - 1]]
+            if not parent.next:
+                parent.next = None
+
+    def size(self):
+        return self._size
+
+    def is_empty(self):
+        return self._size == 0
+
+    def _collect(self, node, prefix, pattern=None):
+        """ generator of the keys in the subtrie of node, whose path from
+        the root is prefix, in sorted order. If pattern is given, only the
+        keys of the same length matching it are generated, '.' matches
+        any character.
+        """
+        stack = [(node, prefix)]
+        while stack:
+            node, prefix = stack.pop()
+            d = len(prefix)
+            if pattern is None or d == len(pattern):
+                if node.val is not None:
+                    yield prefix
+                if pattern is not None:
+                    continue
+            if node.next is None:
+                continue
+            if pattern is not None and pattern[d] != ".":
+                self._index(pattern[d])
+                if pattern[d] in node.next:
+                    stack.append((node.next[pattern[d]], prefix + pattern[d]))
+                continue
+            for c in sorted(node.next, reverse=True):
+                stack.append((node.next[c], prefix + c))
+
+    def keys(self):
+        """ returns a generator of all the keys in sorted order """
+        return self.keys_with_prefix("")
+
+    def __iter__(self):
+        return self.keys()
+
+    def keys_with_prefix(self, prefix):
+        """ returns a generator of the keys that start with prefix """
+        node = self._get_node(prefix)
+        if node is None:
+            return iter([])
+        return self._collect(node, prefix)
+
+    def keys_that_match(self, pattern):
+        """ returns a generator of the keys that match pattern, where '.'
+        matches any character
+        """
+        return self._collect(self._root, "", pattern)
+
+    def longest_prefix_of(self, query):
+        """ returns the longest key that is a prefix of query, None if
+        there is no such key
+        """
+        length = -1
+        node = self._root
+        d = 0
+        while node is not None:
+            if node.val is not None:
+                length = d
+            if d == len(query) or node.next is None:
+                break
+            node = node.next.get(query[d])
+            d += 1
+        if length == -1:
+            return None
+        return query[:length]
+
+
+class TST(object):
+    """Ternary search trie symbol table for string keys. Each node has a
+    character, a value and three links: to the keys whose next character
+    is smaller, equal and larger than the character of the node. The
+    TrieST finds the child of a node in one dict lookup; the TST compares
+    characters down a small binary tree instead, but its nodes are three
+    plain slots where a TrieST node with children has a whole dict, so it
+    takes less memory for large key sets, with the same prefix queries.
+    Keys must be non empty strings. The value None is the absence of a
+    value, thus st[key] = None removes the key.
+
+    arguments: None
+    attributes:
+    1) __setitem__(key, value)   -> adds key,value pair to the ST.
+    2) __getitem__(key)          -> returns value associated with the key.
+    3) __contains__(key)         -> checks to see if key is in the ST.
+    4) delete(key)               -> removes the key from the ST.
+    5) size()                    -> get size of ST.
+    6) keys()                    -> generator of the keys in sorted order.
+    7) keys_with_prefix(prefix)  -> generator of the keys with the prefix.
+    8) keys_that_match(pattern)  -> keys matching pattern, '.' is a wildcard.
+    9) longest_prefix_of(query)  -> longest key that is a prefix of query.
+    """
+
+    class _Node(object):
+        """inner node class"""
+        __slots__ = ("c", "val", "left", "mid", "right")
+
+        def __init__(self, c):
+            self.c = c
+            self.val = None
+            self.left = None
+            self.mid = None
+            self.right = None
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def _get_node(self, key):
+        """ returns the node of the last character of key """
+        node = self._root
+        d = 0
+        while node is not None:
+            c = key[d]
+            if c < node.c:
+                node = node.left
+            elif c > node.c:
+                node = node.right
+            elif d < len(key) - 1:
+                node = node.mid
+                d += 1
+            else:
+                return node
+        return None
+
+    def __setitem__(self, key, val):
+        if len(key) == 0:
+            raise IllegalArgument("key must be a non empty string")
+        if val is None:
+            self.delete(key)
+            return
+        if self._root is None:
+            self._root = TST._Node(key[0])
+        node = self._root
+        d = 0
+        while True:
+            c = key[d]
+            if c < node.c:
+                if node.left is None:
+                    node.left = TST._Node(c)
+                node = node.left
+            elif c > node.c:
+                if node.right is None:
+                    node.right = TST._Node(c)
+                node = node.right
+            elif d < len(key) - 1:
+                d += 1
+                if node.mid is None:
+                    node.mid = TST._Node(key[d])
+                node = node.mid
+            else:
+                break
+        if node.val is None:
+            self._size += 1
+        node.val = val
+
+    def __getitem__(self, key):
+        if len(key) == 0:
+            return None
+        node = self._get_node(key)
+        if node is None:
+            return None
+        return node.val
+
+    def __contains__(self, key):
+        return self[key] is not None
+
+    def delete(self, key):
+        """ removes the key and its value """
+        if len(key) == 0:
+            return
+        node = self._get_node(key)
+        if node is not None and node.val is not None:
+            node.val = None
+            self._size -= 1
+
+    def size(self):
+        return self._size
+
+    def is_empty(self):
+        return self._size == 0
+
+    def _collect(self, node, prefix, pattern=None):
+        """ generator of the keys in the TST rooted at node, whose path
+        from the root is prefix, in sorted order. If pattern is given,
+        only the keys matching it are generated, '.' matches any character.
+        An explicit stack holds the subtries still to visit and the keys to
+        emit, pushed in reverse order: right, mid, key, left.
+        """
+        stack = [(node, prefix)]
+        while stack:
+            node, prefix = stack.pop()
+            if node is None:
+                continue
+            if not isinstance(node, TST._Node):
+                # a key to emit
+                yield prefix
+                continue
+            d = len(prefix)
+            if pattern is None:
+                stack.append((node.right, prefix))
+                stack.append((node.mid, prefix + node.c))
+                if node.val is not None:
+                    stack.append((True, prefix + node.c))
+                stack.append((node.left, prefix))
+                continue
+            c = pattern[d]
+            if c == "." or c > node.c:
+                stack.append((node.right, prefix))
+            if c == "." or c == node.c:
+                if d < len(pattern) - 1:
+                    stack.append((node.mid, prefix + node.c))
+                elif node.val is not None:
+                    stack.append((True, prefix + node.c))
+            if c == "." or c < node.c:
+                stack.append((node.left, prefix))
+
+    def keys(self):
+        """ returns a generator of all the keys in sorted order """
+        return self._collect(self._root, "")
+
+    def __iter__(self):
+        return self.keys()
+
+    def keys_with_prefix(self, prefix):
+        """ returns a generator of the keys that start with prefix """
+        if len(prefix) == 0:
+            return self.keys()
+        node = self._get_node(prefix)
+        if node is None:
+            return iter([])
+        return self._with_prefix(node, prefix)
+
+    def _with_prefix(self, node, prefix):
+        """ generator of prefix, if it is a key, and the keys below the
+        node of its last character
+        """
+        if node.val is not None:
+            yield prefix
+        for key in self._collect(node.mid, prefix):
+            yield key
+
+    def keys_that_match(self, pattern):
+        """ returns a generator of the keys that match pattern, where '.'
+        matches any character
+        """
+        if len(pattern) == 0:
+            return iter([])
+        return self._collect(self._root, "", pattern)
+
+    def longest_prefix_of(self, query):
+        """ returns the longest key that is a prefix of query, None if
+        there is no such key
+        """
+        length = 0
+        node = self._root
+        d = 0
+        while node is not None and d < len(query):
+            c = query[d]
+            if c < node.c:
+                node = node.left
+            elif c > node.c:
+                node = node.right
+            else:
+                d += 1
+                if node.val is not None:
+                    length = d
+                node = node.mid
+        if length == 0:
+            return None
+        return query[:length]
+
+
+class SkipListST(object):
+    """Ordered symbol table implemented as a skip list that can be read
+    while another thread writes. A skip list is a sorted linked list with
+    extra levels of express links: a node has a random number of levels
+    (level i with probability 1/4^i) and every level is a sorted linked
+    list of the nodes that have it. Each link also stores its span, the
+    number of level 0 links it skips, which gives rank and select.
+    Writers are serialized by a lock. A new node is linked bottom up once
+    its own links are set, and a deleted node is unlinked top down and
+    keeps its links, so readers (get, contains, floor, ceiling, min, max
+    and keys) never take the lock and always follow valid links. rank,
+    select and range size read the spans, they retry if a write happened
+    meanwhile. Iteration is weakly consistent: it sees the keys present
+    when it passes them.
+
+    arguments: None
+    attributes: same as BST.
+    """
+
+    MAX_LEVEL = 32
+
+    class _Node(object):
+        """inner node class with the links and their spans"""
+        __slots__ = ("key", "val", "next", "span")
+
+        def __init__(self, key, val, level):
+            self.key = key
+            self.val = val
+            self.next = [None] * level
+            self.span = [0] * level
+
+    def __init__(self):
+        self._head = SkipListST._Node(None, None, SkipListST.MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+        self._version = 0
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def _random_level(self):
+        level = 1
+        while level < SkipListST.MAX_LEVEL and \
+                self._random.random() < 0.25:
+            level += 1
+        return level
+
+    def _predecessor(self, key, strict=True):
+        """ returns the last node with a key smaller than key (smaller or
+        equal if not strict), the head if there is no such node
+        """
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            nxt = node.next[i]
+            while nxt is not None and \
+                    (nxt.key < key or (not strict and nxt.key == key)):
+                node = nxt
+                nxt = node.next[i]
+        return node
+
+    def __setitem__(self, key, val):
+        if not is_comparable(key):
+            raise NotComparable("key is not comparable")
+        with self._lock:
+            update = [None] * SkipListST.MAX_LEVEL
+            rank = [0] * SkipListST.MAX_LEVEL
+            node = self._head
+            for i in range(self._level - 1, -1, -1):
+                if i < self._level - 1:
+                    rank[i] = rank[i + 1]
+                while node.next[i] is not None and node.next[i].key < key:
+                    rank[i] += node.span[i]
+                    node = node.next[i]
+                update[i] = node
+            found = node.next[0]
+            if found is not None and found.key == key:
+                found.val = val
+                return
+
+            self._version += 1
+            level = self._random_level()
+            if level > self._level:
+                for i in range(self._level, level):
+                    update[i] = self._head
+                    self._head.span[i] = self._size
+                self._level = level
+            new_node = SkipListST._Node(key, val, level)
+            for i in range(level):
+                new_node.next[i] = update[i].next[i]
+                new_node.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            # publish the node bottom up
+            for i in range(level):
+                update[i].next[i] = new_node
+                update[i].span[i] = rank[0] - rank[i] + 1
+            for i in range(level, self._level):
+                update[i].span[i] += 1
+            self._size += 1
+            self._version += 1
+
+    def delete(self, key):
+        """ removes the key and its value """
+        with self._lock:
+            update = [None] * SkipListST.MAX_LEVEL
+            node = self._head
+            for i in range(self._level - 1, -1, -1):
+                while node.next[i] is not None and node.next[i].key < key:
+                    node = node.next[i]
+                update[i] = node
+            target = node.next[0]
+            if target is None or not target.key == key:
+                return
+
+            self._version += 1
+            # unlink top down, target keeps its own links
+            for i in range(self._level - 1, -1, -1):
+                if update[i].next[i] is target:
+                    update[i].span[i] += target.span[i] - 1
+                    update[i].next[i] = target.next[i]
+                else:
+                    update[i].span[i] -= 1
+            while self._level > 1 and \
+                    self._head.next[self._level - 1] is None:
+                self._level -= 1
+            self._size -= 1
+            self._version += 1
+
+    def delete_min(self):
+        key = self.min()
+        if key is not None:
+            self.delete(key)
+
+    def delete_max(self):
+        key = self.max()
+        if key is not None:
+            self.delete(key)
+
+    def __getitem__(self, key):
+        node = self._predecessor(key).next[0]
+        if node is not None and node.key == key:
+            return node.val
+        return None
+
+    def __contains__(self, key):
+        node = self._predecessor(key).next[0]
+        return node is not None and node.key == key
+
+    def size(self, lo=None, hi=None):
+        """ returns the number of keys, or the number of keys in [lo, hi] """
+        if lo is None and hi is None:
+            return self._size
+        while True:
+            version = self._version
+            if version % 2 == 0:
+                lo_rank = 0 if lo is None else self._rank(lo)
+                if hi is None:
+                    hi_rank = self._size
+                else:
+                    hi_rank = self._rank(hi, strict=False)
+                if self._version == version:
+                    return max(0, hi_rank - lo_rank)
+
+    def is_empty(self):
+        return self._size == 0
+
+    def min(self):
+        node = self._head.next[0]
+        if node is None:
+            return None
+        return node.key
+
+    def max(self):
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            while node.next[i] is not None:
+                node = node.next[i]
+        return node.key
+
+    def floor(self, key):
+        """ returns the largest key smaller than or equal to key """
+        return self._predecessor(key, strict=False).key
+
+    def ceiling(self, key):
+        """ returns the smallest key larger than or equal to key """
+        node = self._predecessor(key).next[0]
+        if node is None:
+            return None
+        return node.key
+
+    def _rank(self, key, strict=True):
+        """ number of keys smaller than key (smaller or equal if not
+        strict), the sum of the spans on the search path
+        """
+        rank = 0
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            nxt = node.next[i]
+            while nxt is not None and \
+                    (nxt.key < key or (not strict and nxt.key == key)):
+                rank += node.span[i]
+                node = nxt
+                nxt = node.next[i]
+        return rank
+
+    def rank(self, key):
+        """ returns the number of keys smaller than key """
+        while True:
+            version = self._version
+            if version % 2 == 0:
+                rank = self._rank(key)
+                if self._version == version:
+                    return rank
+
+    def _select(self, rank):
+        target = rank + 1
+        traversed = 0
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            while node.next[i] is not None and \
+                    traversed + node.span[i] <= target:
+                traversed += node.span[i]
+                node = node.next[i]
+            if traversed == target:
+                return node.key
+        return None
+
+    def select(self, rank):
+        """ returns the key of given rank """
+        if rank < 0:
+            return None
+        while True:
+            version = self._version
+            if version % 2 == 0:
+                key = self._select(rank)
+                if self._version == version:
+                    return key
+
+    def _nodes(self, lo, hi):
+        if lo is None:
+            node = self._head.next[0]
+        else:
+            node = self._predecessor(lo).next[0]
+        while node is not None:
+            if hi is not None and node.key > hi:
+                return
+            yield node
+            node = node.next[0]
+
+    def keys(self, lo=None, hi=None):
+        """ returns a generator of the keys in [lo, hi] in sorted order """
+        for node in self._nodes(lo, hi):
+            yield node.key
+
+    def values(self, lo=None, hi=None):
+        for node in self._nodes(lo, hi):
+            yield node.val
+
+    def items(self, lo=None, hi=None):
+        for node in self._nodes(lo, hi):
+            yield node.key, node.val
+
+    def __iter__(self):
+        return self.keys()
+
+
+class FenwickTree(object):
+    """Fenwick (binary indexed) tree over an array a[0..n-1] of numbers,
+    for range sums with point and range updates in O(log n).
+    A Fenwick tree t[1..n] stores in t[i] the sum of the lowbit(i) entries
+    ending at i, where lowbit(i) = i & -i, so a prefix sum adds the log n
+    entries found by clearing the low bits of i. Two such trees b1 and b2
+    are kept, over the differences of a, so that adding to a range is two
+    point updates and
+    prefix_sum(i) = (i + 1) * sum(b1[0..i]) - sum(b2[0..i]).
+    All bounds are inclusive.
+
+    arguments: n -> size of the array, dtype=np.float64
+    attributes:
+    1) from_array(values)      -> (class method) build from an array in O(n).
+    2) add(i, delta)           -> a[i] += delta.
+    3) range_add(lo, hi, delta)-> a[lo..hi] += delta.
+    4) get(i)                  -> a[i].
+    5) prefix_sum(i)           -> a[0] + ... + a[i].
+    6) range_sum(lo, hi)       -> a[lo] + ... + a[hi].
+    7) size()                  -> n.
+    """
+
+    def __init__(self, n, dtype=np.float64):
+        self._n = n
+        self._b1 = np.zeros([n + 1], dtype=dtype)
+        self._b2 = np.zeros([n + 1], dtype=dtype)
+
+    @classmethod
+    def from_array(cls, values):
+        """ builds the trees with vectorized cumulative sums:
+        t[i] = prefix[i] - prefix[i - lowbit(i)]
+        """
+        values = np.asarray(values)
+        n = len(values)
+        tree = cls(n, dtype=values.dtype)
+        if n == 0:
+            return tree
+        diff = np.concatenate([values[:1], np.diff(values)])
+        indx = np.arange(1, n + 1)
+        tree._b1 = tree._build(diff)
+        tree._b2 = tree._build(diff * (indx - 1))
+        return tree
+
+    def _build(self, values):
+        prefix = np.zeros([len(values) + 1], dtype=values.dtype)
+        np.cumsum(values, out=prefix[1:])
+        indx = np.arange(len(prefix))
+        return prefix - prefix[indx - (indx & -indx)]
+
+    def _check(self, i):
+        if i < 0 or i >= self._n:
+            raise IndexOutOfBound("index out of range: 0 <= i < n")
+
+    def _add(self, tree, i, delta):
+        """ add delta at 1-based position i """
+        while i <= self._n:
+            tree[i] += delta
+            i += i & -i
+
+    def _sum(self, tree, i):
+        """ sum of tree over 1-based positions [1, i] """
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def range_add(self, lo, hi, delta):
+        """ a[lo..hi] += delta """
+        self._check(lo)
+        self._check(hi)
+        if hi < lo:
+            return
+        self._add(self._b1, lo + 1, delta)
+        self._add(self._b1, hi + 2, -delta)
+        self._add(self._b2, lo + 1, delta * lo)
+        self._add(self._b2, hi + 2, -delta * (hi + 1))
+
+    def add(self, i, delta):
+        """ a[i] += delta """
+        self.range_add(i, i, delta)
+
+    def prefix_sum(self, i):
+        """ a[0] + ... + a[i], 0 if i < 0 """
+        if i < 0:
+            return self._b1.dtype.type(0)
+        self._check(i)
+        return (i + 1) * self._sum(self._b1, i + 1) - \
+            self._sum(self._b2, i + 1)
+
+    def range_sum(self, lo, hi):
+        """ a[lo] + ... + a[hi] """
+        if hi < lo:
+            return self._b1.dtype.type(0)
+        return self.prefix_sum(hi) - self.prefix_sum(lo - 1)
+
+    def get(self, i):
+        return self.range_sum(i, i)
+
+    def size(self):
+        return self._n
+
+
+class SegmentTree(object):
+    """Segment tree over an array a[0..n-1] of numbers, for range sum, min
+    and max queries with point assignment and lazy range add in O(log n).
+    The tree is stored in arrays indexed like a binary heap: node 1 is the
+    whole range, the children of node k are 2k and 2k + 1 and the leaves
+    are at size..2 size - 1, where size is the power of 2 >= n. A range
+    add is applied to the O(log n) nodes that cover the range and
+    remembered in lazy[node]; it is pushed down to the children only when
+    a later operation goes below that node.
+    All bounds are inclusive.
+
+    arguments: n -> size of the array, dtype=np.float64
+    attributes:
+    1) from_array(values)      -> (class method) build from an array in O(n).
+    2) set(i, value)           -> a[i] = value.
+    3) range_add(lo, hi, delta)-> a[lo..hi] += delta.
+    4) get(i)                  -> a[i].
+    5) range_sum(lo, hi)       -> a[lo] + ... + a[hi].
+    6) range_min(lo, hi)       -> min(a[lo..hi]).
+    7) range_max(lo, hi)       -> max(a[lo..hi]).
+    8) prefix_sum(i)           -> a[0] + ... + a[i].
+    9) size()                  -> n.
+    """
+
+    def __init__(self, n, dtype=np.float64):
+        self._n = n
+        self._leaves = 1
+        while self._leaves < n:
+            self._leaves *= 2
+        dtype = np.dtype(dtype)
+        if dtype.kind == "f":
+            high, low = np.inf, -np.inf
+        else:
+            high, low = np.iinfo(dtype).max, np.iinfo(dtype).min
+        size = 2 * self._leaves
+        self._sums = np.zeros([size], dtype=dtype)
+        # padding leaves never win a min or a max
+        self._mins = np.full([size], high, dtype=dtype)
+        self._maxs = np.full([size], low, dtype=dtype)
+        self._mins[self._leaves:self._leaves + n] = 0
+        self._maxs[self._leaves:self._leaves + n] = 0
+        self._lazy = np.zeros([size], dtype=dtype)
+        self._pull_all()
+
+    @classmethod
+    def from_array(cls, values):
+        """ builds the tree bottom up, one vectorized step per level """
+        values = np.asarray(values)
+        tree = cls(len(values), dtype=values.dtype)
+        leaves = tree._leaves
+        tree._sums[leaves:leaves + len(values)] = values
+        tree._mins[leaves:leaves + len(values)] = values
+        tree._maxs[leaves:leaves + len(values)] = values
+        tree._pull_all()
+        return tree
+
+    def _pull_all(self):
+        start = self._leaves // 2
+        while start >= 1:
+            left = slice(2 * start, 4 * start, 2)
+            right = slice(2 * start + 1, 4 * start, 2)
+            self._sums[start:2 * start] = self._sums[left] + self._sums[right]
+            self._mins[start:2 * start] = np.minimum(self._mins[left],
+                                                     self._mins[right])
+            self._maxs[start:2 * start] = np.maximum(self._maxs[left],
+                                                     self._maxs[right])
+            start //= 2
+
+    def _check(self, i):
+        if i < 0 or i >= self._n:
+            raise IndexOutOfBound("index out of range: 0 <= i < n")
+
+    def _apply(self, node, length, delta):
+        """ add delta to every entry below node, which covers length
+        entries """
+        self._sums[node] += delta * length
+        self._mins[node] += delta
+        self._maxs[node] += delta
+        if node < self._leaves:
+            self._lazy[node] += delta
+
+    def _push(self, node, length):
+        """ push the pending add of node down to its children """
+        if self._lazy[node] != 0:
+            self._apply(2 * node, length // 2, self._lazy[node])
+            self._apply(2 * node + 1, length // 2, self._lazy[node])
+            self._lazy[node] = 0
+
+    def _pull(self, node):
+        left, right = 2 * node, 2 * node + 1
+        self._sums[node] = self._sums[left] + self._sums[right]
+        self._mins[node] = min(self._mins[left], self._mins[right])
+        self._maxs[node] = max(self._maxs[left], self._maxs[right])
+
+    def _update(self, node, node_lo, node_hi, lo, hi, delta):
+        if hi < node_lo or node_hi < lo:
+            return
+        if lo <= node_lo and node_hi <= hi:
+            self._apply(node, node_hi - node_lo + 1, delta)
+            return
+        self._push(node, node_hi - node_lo + 1)
+        mid = (node_lo + node_hi) // 2
+        self._update(2 * node, node_lo, mid, lo, hi, delta)
+        self._update(2 * node + 1, mid + 1, node_hi, lo, hi, delta)
+        self._pull(node)
+
+    def _query(self, node, node_lo, node_hi, lo, hi, result):
+        """ combine the (sum, min, max) of the nodes covering [lo, hi]
+        into result """
+        if hi < node_lo or node_hi < lo:
+            return
+        if lo <= node_lo and node_hi <= hi:
+            result[0] += self._sums[node]
+            result[1] = min(result[1], self._mins[node])
+            result[2] = max(result[2], self._maxs[node])
+            return
+        self._push(node, node_hi - node_lo + 1)
+        mid = (node_lo + node_hi) // 2
+        self._query(2 * node, node_lo, mid, lo, hi, result)
+        self._query(2 * node + 1, mid + 1, node_hi, lo, hi, result)
+
+    def _aggregate(self, lo, hi):
+        self._check(lo)
+        self._check(hi)
+        if hi < lo:
+            raise IllegalArgument("empty range: hi < lo")
+        result = [self._sums.dtype.type(0), self._mins[0], self._maxs[0]]
+        self._query(1, 0, self._leaves - 1, lo, hi, result)
+        return result
+
+    def range_add(self, lo, hi, delta):
+        """ a[lo..hi] += delta """
+        self._check(lo)
+        self._check(hi)
+        self._update(1, 0, self._leaves - 1, lo, hi, delta)
+
+    def set(self, i, value):
+        """ a[i] = value """
+        self.range_add(i, i, value - self.get(i))
+
+    def get(self, i):
+        return self._aggregate(i, i)[0]
+
+    def range_sum(self, lo, hi):
+        return self._aggregate(lo, hi)[0]
+
+    def range_min(self, lo, hi):
+        return self._aggregate(lo, hi)[1]
+
+    def range_max(self, lo, hi):
+        return self._aggregate(lo, hi)[2]
+
+    def prefix_sum(self, i):
+        if i < 0:
+            return self._sums.dtype.type(0)
+        return self.range_sum(0, i)
+
+    def size(self):
+        return self._n
+
+
+class _NodeList(object):
+    """circular doubly linked list of cache nodes with a sentinel, the
+    most recently added node is first"""
+
+    def __init__(self):
+        self._sentinel = LRUCacheST._Node(None, None)
+        self._sentinel.prev = self._sentinel
+        self._sentinel.next = self._sentinel
+        self._size = 0
+
+    def is_empty(self):
+        return self._size == 0
+
+    def add_first(self, node):
+        node.prev = self._sentinel
+        node.next = self._sentinel.next
+        self._sentinel.next.prev = node
+        self._sentinel.next = node
+        self._size += 1
+
+    def remove(self, node):
+        node.prev.next = node.next
+        node.next.prev = node.prev
+        node.prev = None
+        node.next = None
+        self._size -= 1
+
+    def last(self):
+        if self._size == 0:
+            return None
+        return self._sentinel.prev
+
+    def __iter__(self):
+        node = self._sentinel.next
+        while node is not self._sentinel:
+            yield node
+            node = node.next
+
+
+class LRUCacheST(object):
+    """Symbol table with a fixed capacity that evicts the least recently
+    used key when it is full. A hash table (dict) maps the keys to nodes of
+    a doubly linked list kept in order of use, so get, put and eviction
+    take constant time. Counts the hits, misses and evictions, and calls
+    on_evict(key, value) for every evicted key.
+    Keys must be hashable. __contains__ does not count as a use.
+
+    arguments: capacity       -> max number of keys
+               on_evict=None  -> function called with each evicted key, value
+    attributes:
+    1) __setitem__(key, value) -> adds key,value pair, may evict a key.
+    2) __getitem__(key)        -> value of the key (a use), None if absent.
+    3) __contains__(key)       -> checks to see if key is in the ST.
+    4) delete(key)             -> removes the key from the ST.
+    5) keys()                  -> generator of the keys, next victim last.
+    6) size(), capacity()      -> number of keys, max number of keys.
+    7) stats()                 -> dict of hits, misses, evictions, hit_rate.
+    """
+
+    class _Node(object):
+        """inner node class"""
+        __slots__ = ("key", "val", "prev", "next", "freq")
+
+        def __init__(self, key, val):
+            self.key = key
+            self.val = val
+            self.prev = None
+            self.next = None
+            self.freq = 1
+
+    def __init__(self, capacity, on_evict=None):
+        if capacity < 1:
+            raise IllegalArgument("capacity must be positive")
+        self._capacity = capacity
+        self._on_evict = on_evict
+        self._index = dict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._setup()
+
+    # recency list, overridden by the LFU cache
+    def _setup(self):
+        self._list = _NodeList()
+
+    def _add(self, node):
+        self._list.add_first(node)
+
+    def _remove(self, node):
+        self._list.remove(node)
+
+    def _touch(self, node):
+        """ node was used, move it to the front """
+        self._list.remove(node)
+        self._list.add_first(node)
+
+    def _victim(self):
+        return self._list.last()
+
+    def _nodes(self):
+        return iter(self._list)
+
+    def __setitem__(self, key, val):
+        node = self._index.get(key)
+        if node is not None:
+            node.val = val
+            self._touch(node)
+            return
+        if len(self._index) >= self._capacity:
+            victim = self._victim()
+            self._remove(victim)
+            del self._index[victim.key]
+            self._evictions += 1
+            if self._on_evict is not None:
+                self._on_evict(victim.key, victim.val)
+        node = LRUCacheST._Node(key, val)
+        self._index[key] = node
+        self._add(node)
+
+    def __getitem__(self, key):
+        node = self._index.get(key)
+        if node is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._touch(node)
+        return node.val
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def delete(self, key):
+        """ removes the key and its value, without calling on_evict """
+        node = self._index.pop(key, None)
+        if node is not None:
+            self._remove(node)
+
+    def keys(self):
+        for node in self._nodes():
+            yield node.key
+
+    def __iter__(self):
+        return self.keys()
+
+    def size(self):
+        return len(self._index)
+
+    def is_empty(self):
+        return len(self._index) == 0
+
+    def capacity(self):
+        return self._capacity
+
+    def stats(self):
+        """ returns a dict with the hits, misses, evictions and hit rate """
+        lookups = self._hits + self._misses
+        return {"hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": float(self._hits) / lookups if lookups else 0.0}
+
+
+class LFUCacheST(LRUCacheST):
+    """Symbol table with a fixed capacity that evicts the least frequently
+    used key when it is full, the least recently used one among those.
+    Nodes are kept in frequency buckets, a dict from a use count to a
+    doubly linked list of the nodes used that many times, and the smallest
+    count is tracked, so get, put and eviction take constant time.
+
+    arguments: same as LRUCacheST
+    attributes: same as LRUCacheST.
+    """
+
+    def _setup(self):
+        self._buckets = dict()
+        self._min_freq = 1
+
+    def _add(self, node):
+        node.freq = 1
+        self._min_freq = 1
+        self._bucket(1).add_first(node)
+
+    def _bucket(self, freq):
+        bucket = self._buckets.get(freq)
+        if bucket is None:
+            bucket = _NodeList()
+            self._buckets[freq] = bucket
+        return bucket
+
+    def _remove(self, node):
+        bucket = self._buckets[node.freq]
+        bucket.remove(node)
+        if bucket.is_empty():
+            del self._buckets[node.freq]
+
+    def _touch(self, node):
+        """ node was used, move it to the next bucket """
+        freq = node.freq
+        self._remove(node)
+        if freq == self._min_freq and freq not in self._buckets:
+            self._min_freq = freq + 1
+        node.freq = freq + 1
+        self._bucket(freq + 1).add_first(node)
+
+    def _victim(self):
+        if self._min_freq not in self._buckets:
+            # the min bucket was emptied by delete
+            self._min_freq = min(self._buckets)
+        return self._buckets[self._min_freq].last()
+
+    def _nodes(self):
+        for freq in sorted(self._buckets, reverse=True):
+            for node in self._buckets[freq]:
+                yield node
+
+
+class PersistentBST(BST):
+    """Persistent binary search tree: nodes are never modified once they
+    are in a tree. put and delete copy the nodes on the path from the
+    root to the changed node (path copying) and link the copies to the
+    untouched subtrees, then publish the new root with one assignment.
+    Every root is thus an immutable version of the tree that shares its
+    unchanged subtrees with the other versions. snapshot() takes the
+    current root in O(1), and readers (or iterators, which hold the root
+    they started with) see a consistent version without locks, while
+    writes are serialized by a lock.
+    Balance is not guaranteed, as for the BST.
+
+    arguments: None
+    attributes: same as BST, and
+    1) snapshot() -> read only view of the current version.
+    """
+
+    def __init__(self):
+        super(PersistentBST, self).__init__()
+        self._lock = threading.Lock()
+
+    def _copy_path(self, path, new_node, size_change):
+        """ copy the nodes of path, a list of (node, went_left) from the
+        root, bottom up and link them to new_node. Returns the new root.
+        """
+        for node, went_left in reversed(path):
+            if went_left:
+                new_node = self._Node(node.key, node.val, new_node,
+                                      node.right, node.size + size_change)
+            else:
+                new_node = self._Node(node.key, node.val, node.left,
+                                      new_node, node.size + size_change)
+        return new_node
+
+    def _search_path(self, root, key):
+        """ returns the path to key as a list of (node, went_left) and the
+        node of key, or None """
+        path = []
+        node = root
+        while node is not None:
+            if key < node.key:
+                path.append((node, True))
+                node = node.left
+            elif key > node.key:
+                path.append((node, False))
+                node = node.right
+            else:
+                break
+        return path, node
+
+    def _put(self, put_node, key, val):
+        """ returns the root of a new version of the tree rooted at
+        put_node with the key value pair, put_node is unchanged
+        """
+        path, node = self._search_path(put_node, key)
+        if node is None:
+            return self._copy_path(path, self._Node(key, val, size=1), 1)
+        new_node = self._Node(key, val, node.left, node.right, node.size)
+        return self._copy_path(path, new_node, 0)
+
+    def _delete(self, root, key):
+        """ returns the root of a new version of the tree rooted at root
+        without key (Hibbard deletion with path copying)
+        """
+        path, node = self._search_path(root, key)
+        if node is None:
+            return root
+        if node.left is None:
+            replacement = node.right
+        elif node.right is None:
+            replacement = node.left
+        else:
+            # copy the path to the successor, without the successor
+            successor_path = []
+            successor = node.right
+            while successor.left is not None:
+                successor_path.append((successor, True))
+                successor = successor.left
+            right = self._copy_path(successor_path, successor.right, -1)
+            replacement = self._Node(successor.key, successor.val,
+                                     node.left, right, node.size - 1)
+        return self._copy_path(path, replacement, -1)
+
+    def __setitem__(self, key, val):
+        if not is_comparable(key):
+            raise NotComparable("key is not comparable")
+        with self._lock:
+            self._root = self._put(self._root, key, val)
+
+    def delete(self, key):
+        """ removes the key and its value """
+        with self._lock:
+            self._root = self._delete(self._root, key)
+
+    def delete_min(self):
+        with self._lock:
+            if self._root is not None:
+                self._root = self._delete(self._root, self.min())
+
+    def delete_max(self):
+        with self._lock:
+            if self._root is not None:
+                self._root = self._delete(self._root, self.max())
+
+    def snapshot(self):
+        """ returns a PersistentBST sharing the current version """
+        view = self.__class__()
+        view._root = self._root
+        return view
+
+
+class BloomFilter(object):
+    """Set membership test with false positives but no false negatives,
+    kept in a NumPy bit array. Sized for capacity keys at the given false
+    positive rate: m = -n ln(p) / ln(2)^2 bits and k = m / n ln(2) probes.
+    The probes use double hashing, h1 + i * h2 for i in 0..k-1, from one
+    64 bit mix of hash(key). Keys must be hashable, and cannot be removed.
+
+    arguments: capacity=1000    -> expected number of keys
+               error_rate=0.01  -> false positive rate at capacity keys
+    attributes:
+    1) add(key)          -> adds the key to the filter.
+    2) __contains__(key) -> False if the key was never added, True if it
+                            probably was.
+    3) size()            -> number of keys added.
+    4) capacity()        -> expected number of keys.
+    5) bits(), probes()  -> number of bits m and of probes k per key.
+    """
+
+    _MASK = (1 << 64) - 1
+
+    def __init__(self, capacity=1000, error_rate=0.01):
+        if capacity < 1:
+            raise IllegalArgument("capacity must be positive")
+        if not 0.0 < error_rate < 1.0:
+            raise IllegalArgument("error_rate must be between 0 and 1")
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._m = max(8, int(np.ceil(-capacity * np.log(error_rate) /
+                                     np.log(2) ** 2)))
+        self._k = max(1, int(round(float(self._m) / capacity * np.log(2))))
+        self._bits = np.zeros((self._m + 7) // 8, dtype=np.uint8)
+        self._steps = np.arange(self._k, dtype=np.int64)
+        self._size = 0
+
+    def _hashes(self, key):
+        """ splitmix64 of hash(key), split in two 32 bit hashes """
+        h = (hash(key) + 0x9E3779B97F4A7C15) & self._MASK
+        h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & self._MASK
+        h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & self._MASK
+        h ^= h >> 31
+        return h & 0xFFFFFFFF, (h >> 32) | 1
+
+    def add(self, key):
+        h1, h2 = self._hashes(key)
+        positions = (h1 + self._steps * h2) % self._m
+        np.bitwise_or.at(self._bits, positions >> 3,
+                         np.left_shift(1, positions & 7).astype(np.uint8))
+        self._size += 1
+
+    def __contains__(self, key):
+        # probe one bit at a time, most misses stop at the first probes
+        h1, h2 = self._hashes(key)
+        bits = self._bits
+        for i in xrange(self._k):
+            pos = (h1 + i * h2) % self._m
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def size(self):
+        return self._size
+
+    def capacity(self):
+        return self._capacity
+
+    def error_rate(self):
+        return self._error_rate
+
+    def bits(self):
+        return self._m
+
+    def probes(self):
+        return self._k
+
+
+class BloomFilterST(object):
+    """Bloom filter in front of any symbol table, so lookups of absent keys
+    return without searching the table. New keys put through the wrapper
+    are added to the filter (updates of a key already in the table are
+    not); when more keys than the capacity have been added the filter is
+    rebuilt from st.keys() with twice the capacity. Deleted
+    keys stay in the filter until the next rebuild, which only costs a
+    search of the table. Other methods (min, rank, ...) go to the table.
+    Counts the lookups rejected by the filter and the false positives.
+
+    arguments: st                -> the symbol table, may already hold keys
+               capacity=1000     -> initial capacity of the filter
+               error_rate=0.01   -> false positive rate of the filter
+    attributes:
+    1) __setitem__(key, value) -> adds key,value pair to the ST.
+    2) __getitem__(key)        -> value of the key, None if absent.
+    3) __contains__(key)       -> checks to see if key is in the ST.
+    4) delete(key)             -> removes the key from the ST, if the ST
+                                  has delete (BinarySearchST does not).
+    5) st()                    -> the wrapped symbol table.
+    6) stats()                 -> dict of lookups, rejected, false_positives
+                                  and false_positive_rate.
+    """
+
+    def __init__(self, st, capacity=1000, error_rate=0.01):
+        self._st = st
+        self._error_rate = error_rate
+        self._lookups = 0
+        self._rejected = 0
+        self._false_positives = 0
+        self._rebuild(max(capacity, st.size()))
+
+    def _rebuild(self, capacity):
+        self._filter = BloomFilter(capacity, self._error_rate)
+        for key in self._st.keys():
+            self._filter.add(key)
+
+    def _may_contain(self, key):
+        self._lookups += 1
+        if key not in self._filter:
+            self._rejected += 1
+            return False
+        return True
+
+    def __setitem__(self, key, val):
+        # only new keys are added to the filter, updates leave it as is
+        new = key not in self._filter or key not in self._st
+        self._st[key] = val
+        if new:
+            self._filter.add(key)
+            if self._filter.size() > self._filter.capacity():
+                self._rebuild(2 * self._filter.capacity())
+
+    def __getitem__(self, key):
+        if not self._may_contain(key):
+            return None
+        val = self._st[key]
+        if val is None:
+            self._false_positives += 1
+        return val
+
+    def __contains__(self, key):
+        if not self._may_contain(key):
+            return False
+        found = key in self._st
+        if not found:
+            self._false_positives += 1
+        return found
+
+    def delete(self, key):
+        if not hasattr(self._st, "delete"):
+            raise IllegalArgument("the wrapped ST does not support delete")
+        self._st.delete(key)
+
+    def __getattr__(self, name):
+        if name == "_st":
+            raise AttributeError(name)
+        return getattr(self._st, name)
+
+    def st(self):
+        return self._st
+
+    def stats(self):
+        """ returns a dict with the lookups, the lookups rejected by the
+        filter and the false positives of the filter """
+        return {"lookups": self._lookups,
+                "rejected": self._rejected,
+                "false_positives": self._false_positives,
+                "false_positive_rate":
+                    float(self._false_positives) / self._lookups
+                    if self._lookups else 0.0}
@@ -4,6 +4,7 @@ from AlgoDS.graphs import DetectCycle
 from AlgoDS.graphs import ShortestAncestralPath
 from AlgoDS.graphs import GraphReadError
 from AlgoDS.basicDS import Stack
+from AlgoDS.treeDS import TST
 from collections import defaultdict
 import csv
 import numpy as np
@@ -20,6 +21,8 @@ class WordNet(object):
     get_nouns()
     # is the word a WordNet noun
     is_noun(word)
+    # WordNet nouns that start with prefix (autocomplete)
+    nouns_with_prefix(prefix)
     # distance between noun_a, noun_b
     distance(noun_a, noun_b)
     # shortest ancestral path between noun_a, noun_b
@@ -44,8 +47,11 @@ class WordNet(object):
         for i in range(num_vert):
             self.id[i] = Stack()
 
+        # prefix index over the nouns : noun -> synset ids
+        self.noun_index = TST()
         for key in self.nouns.keys():
             indx_arr = self.nouns[key]
+            self.noun_index[key] = indx_arr
             for indx in indx_arr:
                 self.id[indx].push(key)
 
@@ -82,6 +88,10 @@ class WordNet(object):
     def is_noun(self, word):
         return word in self.nouns
 
+    def nouns_with_prefix(self, prefix):
+        """ generator of the nouns starting with prefix in sorted order """
+        return self.noun_index.keys_with_prefix(prefix)
+
     def distance(self, noun_a, noun_b):
         if (noun_a not in self.nouns) or (noun_b not in self.nouns):
             raise GraphReadError("nouns are not in WordNet")
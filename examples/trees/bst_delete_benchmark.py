@@ -0,0 +1,71 @@
+""" Compare a delete heavy workload on the search trees of treeDS against
+rebuilding the tree without the expired keys.
+The tree holds n keys, and in every round a batch of the keys is expired
+and the same number of new random keys is inserted: either the expired keys are
+deleted from the tree, or a new tree is built from the keys that are
+still alive (what we had to do before BST supported deletion).
+
+usage: python bst_delete_benchmark.py [n] [rounds] [batch]
+"""
+from AlgoDS.treeDS import BST
+from AlgoDS.treeDS import RedBlackBST
+import random
+import sys
+import time
+
+
+def delete_workload(cls, keys, new_keys, rounds, batch, rng):
+    st = cls()
+    for key in keys:
+        st[key] = key
+    alive = list(keys)
+    fresh = iter(new_keys)
+    start = time.time()
+    for r in range(rounds):
+        rng.shuffle(alive)
+        for key in alive[:batch]:
+            st.delete(key)
+        alive = alive[batch:]
+        for indx in range(batch):
+            key = next(fresh)
+            st[key] = key
+            alive.append(key)
+    return time.time() - start
+
+
+def rebuild_workload(cls, keys, new_keys, rounds, batch, rng):
+    st = cls()
+    for key in keys:
+        st[key] = key
+    alive = list(keys)
+    fresh = iter(new_keys)
+    start = time.time()
+    for r in range(rounds):
+        rng.shuffle(alive)
+        alive = alive[batch:]
+        st = cls()
+        for key in alive:
+            st[key] = key
+        for indx in range(batch):
+            key = next(fresh)
+            st[key] = key
+            alive.append(key)
+    return time.time() - start
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    batch = int(sys.argv[3]) if len(sys.argv) > 3 else n // 10
+
+    all_keys = random.Random(0).sample(range(10 * n), n + rounds * batch)
+    keys = all_keys[:n]
+    new_keys = all_keys[n:]
+    print "n =", n, "rounds =", rounds, "batch =", batch
+    for cls in [BST, RedBlackBST]:
+        t_delete = delete_workload(cls, keys, new_keys, rounds, batch,
+                                   random.Random(1))
+        t_rebuild = rebuild_workload(cls, keys, new_keys, rounds, batch,
+                                     random.Random(1))
+        print "%-12s delete: %8.3f s  rebuild: %8.3f s  speedup: %6.1fx" % \
+            (cls.__name__, t_delete, t_rebuild, t_rebuild / t_delete)
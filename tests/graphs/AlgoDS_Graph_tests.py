@@ -11,11 +11,31 @@ from AlgoDS.graphs import Degrees
 from AlgoDS.graphs import ShortestAncestralPath
 from AlgoDS.graphs import StrongCC
 from AlgoDS.graphs import KruskalMST
+from AlgoDS.graphs import TopologicalSort
+from AlgoDS.graphs import FrontierBFS
+from AlgoDS.graphs import EdgeWeightedDigraph
+from AlgoDS.graphs import DirectedEdge
+from AlgoDS.graphs import DijkstraSP
+from AlgoDS.graphs import BidirectionalBFS
+from AlgoDS.graphs import PrimMST
+from AlgoDS.graphs import SortedKruskalMST
+from AlgoDS.graphs import Edge
+from AlgoDS.graphs import TarjanSCC
+from AlgoDS.graphs import KahnTopologicalSort
+from AlgoDS.graphs import IncrementalConnectedComponents
+from AlgoDS.graphs import CSRGraph
+from AlgoDS.graphs import GraphReadError
+from AlgoDS.graphs import read_edge_list
+from AlgoDS.graphs import save_edge_list
+from AlgoDS.basicDS import IllegalArgument
 from AlgoDS.basicDS import Queue
 from AlgoDS.basicDS import Bag
 from AlgoDS.basicDS import Stack
 import numpy as np
 import fileinput
+import os
+import shutil
+import tempfile
 
 
 def test_graphs_Graph():
@@ -196,16 +216,389 @@ def test_graphs_KruskalMST():
         print "\n"
 
 
+def test_graphs_CSRGraph():
+    """ test the CSR graph against the adjacency list graph """
+    G = Graph.read_from_file(fileinput.input("tinyG.txt"))
+    C = CSRGraph.from_graph(G)
+    assert_equal(C.get_v(), G.get_v())
+    assert_equal(C.get_e(), G.get_e())
+    for v in range(G.get_v()):
+        assert_equal(list(C.adjacent_to(v)), list(G.adjacent_to(v)))
+    cc = ConnectedComponents(C)
+    assert_equal(cc.get_count(), ConnectedComponents(G).get_count())
+    assert_true(cc.are_connected(0, 6))
+    assert_false(cc.are_connected(0, 9))
+    bf = BFS(C, [0])
+    assert_equal(list(bf.path_to(3)), list(BFS(G, [0]).path_to(3)))
+    df = DFS(C, [0])
+    assert_equal(list(df.path_to(3)), list(DFS(G, [0]).path_to(3)))
+
+    E = CSRGraph.from_edges(4, [[0, 1], [2, 1], [1, 3]])
+    assert_equal(E.get_e(), 3)
+    assert_equal(list(E.adjacent_to(1)), [0, 2, 3])
+    assert_raises(IllegalArgument, CSRGraph.from_edges, 2, [[0, 2]])
+    # source vertices >= 2^31 do not fit the packed sort keys
+    big = np.array([2 ** 40, 3, 2 ** 31, 3, 0], dtype=np.int64)
+    assert_equal(CSRGraph._stable_order(big).tolist(), [4, 1, 3, 2, 0])
+    assert_equal(CSRGraph._stable_order(big[1:]).tolist(), [3, 0, 2, 1])
+    assert_raises(ValueError, E.indices.fill, 0)
+
+
+def test_graphs_CSRGraph_directed():
+    """ test Degrees and StrongCC on a directed CSR graph """
+    G = DirectedGraph.read_from_file(fileinput.input("tinyDG.txt"))
+    C = CSRGraph.from_graph(G)
+    assert_true(C.is_directed())
+    deg = Degrees(G)
+    deg_csr = Degrees(C)
+    for v in range(G.get_v()):
+        assert_equal(deg_csr.get_indegree(v), deg.get_indegree(v))
+        assert_equal(deg_csr.get_outdegree(v), deg.get_outdegree(v))
+    R = C.reverse()
+    for v in range(G.get_v()):
+        assert_equal(sorted(R.adjacent_to(v)),
+                     sorted(G.reverse().adjacent_to(v)))
+    scc = StrongCC(C)
+    assert_equal(scc.get_count(), StrongCC(G).get_count())
 
 
+def test_graphs_CSRGraph_KruskalMST():
+    """ test KruskalMST on a weighted CSR graph """
+    G = EdgeWeightedGraph.read_from_file(fileinput.input("tinyEWG.txt"))
+    C = CSRGraph.from_graph(G)
+    weight = sum(e.get_weight() for e in KruskalMST(G).get_mst())
+    weight_csr = sum(e.get_weight() for e in KruskalMST(C).get_mst())
+    assert_almost_equal(weight_csr, weight)
+    assert_equal(len(list(C.edges())), G.get_e())
 
 
+def test_graphs_read_from_path():
+    """ test the bulk loader against read_from_file """
+    G = Graph.read_from_file(fileinput.input("tinyG.txt"))
+    P = Graph.read_from_path("tinyG.txt")
+    assert_equal(P.get_e(), G.get_e())
+    for v in range(G.get_v()):
+        assert_equal(list(P.adjacent_to(v)), list(G.adjacent_to(v)))
+    lines = open("tinyG.txt").readlines()
+    assert_equal(Graph.read_from_file(lines).get_e(), G.get_e())
+    W = EdgeWeightedGraph.read_from_path("tinyEWG.txt")
+    assert_equal(W.get_e(), 16)
+    assert_equal(str(W), str(EdgeWeightedGraph.read_from_file(
+        fileinput.input("tinyEWG.txt"))))
+    D = DirectedGraph.read_from_path("tinyDG.txt")
+    assert_equal(D.get_e(), 22)
+    assert_raises(GraphReadError, EdgeWeightedGraph.read_from_path,
+                  "tinyG.txt")
+
+
+def test_graphs_binary_edge_list():
+    """ test the binary edge list and CSR formats """
+    path = tempfile.mkdtemp()
+    try:
+        vertices, edges, weights = read_edge_list("tinyEWG.txt", True)
+        save_edge_list(os.path.join(path, "ewg"), vertices, edges, weights)
+        v2, e2, w2 = read_edge_list(os.path.join(path, "ewg"), True)
+        assert_true(isinstance(e2, np.memmap))
+        assert_equal(v2, vertices)
+        assert_equal(e2.tolist(), edges.tolist())
+        assert_equal(w2.tolist(), weights.tolist())
+        W = EdgeWeightedGraph.read_from_path(os.path.join(path, "ewg"))
+        assert_equal(W.get_e(), 16)
+
+        C = CSRGraph.read_from_path("tinyEWG.txt", weighted=True)
+        C.save(os.path.join(path, "csr"))
+        L = CSRGraph.load(os.path.join(path, "csr"))
+        assert_false(L.is_directed())
+        assert_equal(L.indices.tolist(), C.indices.tolist())
+        assert_equal(L.weights.tolist(), C.weights.tolist())
+        assert_equal(str(L), str(C))
+    finally:
+        shutil.rmtree(path)
+
+
+def test_graphs_deep_DFS():
+    """ test the depth first classes on a path longer than the
+    recursion limit """
+    n = 50000
+    G = DirectedGraph(n)
+    for v in range(n - 1):
+        G.add_edge(v, v + 1)
+    df = DFS(G, [0])
+    assert_equal(df.get_count(), 1)
+    assert_equal(len(list(df.path_to(n - 1))), n)
+    assert_equal(list(TopologicalOrder(G).get_order()), range(n))
+    assert_equal(list(TopologicalOrder(G, "post").get_order()),
+                 range(n - 1, -1, -1))
+    assert_true(TopologicalSort(G).is_DAG())
+    assert_equal(StrongCC(G).get_count(), n)
+
+    G.add_edge(n - 1, 0)
+    cycle = DetectCycle(G)
+    assert_true(cycle.has_cycle())
+    assert_equal(list(cycle.get_cycle()), [n - 1] + range(n))
+    assert_equal(StrongCC(G).get_count(), 1)
+    cc = ConnectedComponents(CSRGraph.from_graph(G))
+    assert_equal(cc.get_count(), 1)
+
+
+def test_graphs_FrontierBFS():
+    """ test the level synchronous BFS against BFS """
+    G = Graph.read_from_file(fileinput.input("tinyG.txt"))
+    for packed in (False, True):
+        fb = FrontierBFS(G, [0], packed)
+        bf = BFS(G, [0])
+        for v in range(G.get_v()):
+            assert_equal(fb.has_path_to(v), bf.is_marked(v))
+            if bf.is_marked(v):
+                assert_equal(fb.distance_to(v), len(list(bf.path_to(v))) - 1)
+                path = list(fb.path_to(v))
+                assert_equal(path[0], 0)
+                assert_equal(path[-1], v)
+        assert_equal(fb.path_to(9), None)
+        assert_equal(fb.get_levels(), 3)
+    multi = FrontierBFS(G, [0, 9])
+    assert_equal(multi.distance_to(12), 1)
+    assert_equal(multi.get_parents()[9], 9)
+    assert_raises(IllegalArgument, FrontierBFS, G, [13])
+
+
+def test_graphs_FrontierBFS_random():
+    """ test distances on a random directed graph """
+    np.random.seed(7)
+    n = 2000
+    edges = np.random.randint(0, n, size=(6000, 2))
+    C = CSRGraph.from_edges(n, edges, directed=True)
+    expected = [-1] * n
+    expected[5] = 0
+    queue = [5]
+    for v in queue:
+        for w in C.adjacent_to(v):
+            if expected[w] < 0:
+                expected[w] = expected[v] + 1
+                queue.append(w)
+    for packed in (False, True):
+        fb = FrontierBFS(C, [5], packed)
+        assert_equal(fb.get_distances().tolist(), expected)
+        parents = fb.get_parents()
+        for v in range(n):
+            if expected[v] > 0:
+                assert_equal(expected[parents[v]], expected[v] - 1)
+                assert_true(v in C.adjacent_to(parents[v]))
+
+
+def test_graphs_DijkstraSP():
+    """ test the shortest paths on tinyEWD """
+    G = EdgeWeightedDigraph.read_from_file(fileinput.input("tinyEWD.txt"))
+    assert_equal(G.get_e(), 15)
+    assert_equal(G.edges().size(), 15)
+    expected = [0.0, 1.05, 0.26, 0.99, 0.38, 0.73, 1.51, 0.60]
+    sp = DijkstraSP(G, 0)
+    for v in range(G.get_v()):
+        assert_true(sp.has_path_to(v))
+        assert_almost_equal(sp.dist_to(v), expected[v])
+    path = [(e.from_vertex(), e.to_vertex()) for e in sp.path_to(6)]
+    assert_equal(path, [(0, 2), (2, 7), (7, 3), (3, 6)])
+    assert_equal(sp.path_to(0).size(), 0)
+
+    # early exit: the target is final, farther vertices are not searched
+    sp = DijkstraSP(G, 0, target=2)
+    assert_almost_equal(sp.dist_to(2), 0.26)
+    assert_false(sp.has_path_to(6))
+
+    C = CSRGraph.read_from_path("tinyEWD.txt", weighted=True, directed=True)
+    sp = DijkstraSP(C, 0)
+    for v in range(G.get_v()):
+        assert_almost_equal(sp.dist_to(v), expected[v])
+    assert_equal(len(list(sp.path_to(1))), 3)
 
+    H = EdgeWeightedDigraph(3)
+    H.add_edge(DirectedEdge(0, 1, 1.0))
+    H.add_edge(DirectedEdge(2, 0, -1.0))
+    sp = DijkstraSP(H, 0)
+    assert_false(sp.has_path_to(2))
+    assert_equal(sp.path_to(2), None)
+    assert_raises(IllegalArgument, DijkstraSP, H, 2)
 
 
+def test_graphs_DijkstraSP_undirected():
+    """ test the shortest paths on an undirected graph """
+    G = EdgeWeightedGraph.read_from_file(fileinput.input("tinyEWG.txt"))
+    sp = DijkstraSP(G, 6)
+    for v in range(G.get_v()):
+        current = 6
+        total = 0.0
+        for e in sp.path_to(v):
+            assert_equal(e.from_vertex(), current)
+            current = e.to_vertex()
+            total += e.get_weight()
+        assert_equal(current, v)
+        assert_almost_equal(total, sp.dist_to(v))
+
+
+def test_graphs_BidirectionalBFS():
+    """ test point to point paths against FrontierBFS """
+    G = DirectedGraph.read_from_file(fileinput.input("tinyDG.txt"))
+    bb = BidirectionalBFS(G)
+    for s in range(G.get_v()):
+        distances = FrontierBFS(G, [s]).get_distances()
+        for t in range(G.get_v()):
+            assert_equal(bb.distance(s, t), distances[t])
+            path = bb.path(s, t)
+            if path is not None:
+                path = list(path)
+                assert_equal(path[0], s)
+                assert_equal(path[-1], t)
+                for v, w in zip(path, path[1:]):
+                    assert_true(w in list(G.adjacent_to(v)))
+    assert_equal(list(bb.path(3, 3)), [3])
+    assert_raises(IllegalArgument, bb.path, 0, 13)
+
+
+def test_graphs_BidirectionalBFS_add_edge():
+    """ test queries see the edges added after an earlier query """
+    G = DirectedGraph(6)
+    G.add_edge(0, 1)
+    G.add_edge(1, 2)
+    G.add_edge(2, 3)
+    bb = BidirectionalBFS(G)
+    assert_equal(bb.distance(0, 3), 3)
+    G.add_edge(0, 5)
+    G.add_edge(5, 3)
+    assert_equal(bb.distance(0, 3), 2)
+    assert_equal(list(bb.path(0, 3)), [0, 5, 3])
+    assert_equal(bb.distance(4, 3), -1)
+    G.add_edge(4, 3)
+    assert_equal(bb.distance(4, 3), 1)
+
+
+def test_graphs_BidirectionalBFS_touched():
+    """ test a query touches few vertices of a large random graph """
+    np.random.seed(3)
+    n = 100000
+    C = CSRGraph.from_edges(n, np.random.randint(0, n, size=(4 * n, 2)))
+    bb = BidirectionalBFS(C)
+    distances = FrontierBFS(C, [0]).get_distances()
+    for t in (1, 2, 3):
+        assert_equal(bb.distance(0, t), distances[t])
+        assert_true(bb.get_touched() < n / 10)
+    D = CSRGraph.from_edges(n, np.random.randint(0, n, size=(4 * n, 2)),
+                            directed=True)
+    bb = BidirectionalBFS(D)
+    distances = FrontierBFS(D, [0]).get_distances()
+    for t in (1, 2, 3):
+        assert_equal(bb.distance(0, t), distances[t])
+
+
+def test_graphs_PrimMST_SortedKruskalMST():
+    """ test the MST weights on tinyEWG and a random forest """
+    G = EdgeWeightedGraph.read_from_file(fileinput.input("tinyEWG.txt"))
+    C = CSRGraph.from_graph(G)
+    for mst in (KruskalMST(G), PrimMST(G), PrimMST(C),
+                SortedKruskalMST(G), SortedKruskalMST(C)):
+        assert_almost_equal(mst.weight(), 1.81)
+        assert_equal(mst.edges().size(), 7)
+
+    np.random.seed(11)
+    n = 300
+    edges = np.random.randint(0, n // 2, size=(1000, 2))
+    edges[500:] += n // 2
+    weights = np.random.random(1000)
+    G = EdgeWeightedGraph(n)
+    for (v, w), weight in zip(edges.tolist(), weights.tolist()):
+        G.add_edge(Edge(v, w, weight))
+    C = CSRGraph.from_edges(n, edges, weights)
+    expected = KruskalMST(G).weight()
+    count = KruskalMST(G).edges().size()
+    for mst in (PrimMST(G), PrimMST(C), SortedKruskalMST(G),
+                SortedKruskalMST(C)):
+        assert_almost_equal(mst.weight(), expected)
+        assert_equal(mst.edges().size(), count)
+
+
+def _same_partition(a, b, n):
+    for v in range(n):
+        for w in range(n):
+            if a.are_connected(v, w) != b.are_connected(v, w):
+                return False
+    return True
+
+
+def test_graphs_TarjanSCC():
+    """ test TarjanSCC against StrongCC """
+    G = DirectedGraph.read_from_file(fileinput.input("tinyDG.txt"))
+    tarjan = TarjanSCC(G)
+    assert_equal(tarjan.get_count(), 5)
+    assert_true(_same_partition(tarjan, StrongCC(G), G.get_v()))
+
+    np.random.seed(5)
+    n = 60
+    edges = np.random.randint(0, n, size=(90, 2))
+    C = CSRGraph.from_edges(n, edges, directed=True)
+    tarjan = TarjanSCC(C)
+    scc = StrongCC(C)
+    assert_equal(tarjan.get_count(), scc.get_count())
+    assert_true(_same_partition(tarjan, scc, n))
+    # reverse topological numbering: edges go to the same or lower ids
+    for v, w in edges.tolist():
+        assert_true(tarjan.get_id(w) <= tarjan.get_id(v))
+
+
+def test_graphs_TarjanSCC_deep():
+    """ test TarjanSCC on a path longer than the recursion limit """
+    n = 50000
+    C = CSRGraph.from_edges(n, [[v, v + 1] for v in range(n - 1)],
+                            directed=True)
+    assert_equal(TarjanSCC(C).get_count(), n)
+    C = CSRGraph.from_edges(n, [[v, (v + 1) % n] for v in range(n)],
+                            directed=True)
+    assert_equal(TarjanSCC(C).get_count(), 1)
+
+
+def test_graphs_KahnTopologicalSort():
+    """ test the Kahn sort on a DAG and on graphs with cycles """
+    G = DirectedGraph.read_from_file(fileinput.input("tinyDAG.txt"))
+    kahn = KahnTopologicalSort(G)
+    assert_true(kahn.is_DAG())
+    assert_equal(kahn.get_cyclic_vertices(), None)
+    order = kahn.sort().tolist()
+    assert_equal(sorted(order), range(G.get_v()))
+    position = dict((v, i) for i, v in enumerate(order))
+    for v in range(G.get_v()):
+        for w in G.adjacent_to(v):
+            assert_true(position[v] < position[w])
+            assert_true(kahn.get_level(v) < kahn.get_level(w))
 
+    G = DirectedGraph.read_from_file(fileinput.input("tinyDG.txt"))
+    kahn = KahnTopologicalSort(G)
+    assert_false(kahn.is_DAG())
+    assert_equal(kahn.sort(), None)
+    assert_equal(kahn.get_cyclic_vertices().tolist(), range(G.get_v()))
 
+    n = 20000
+    edges = [[v, v + 1] for v in range(n - 1)] + [[n - 1, n - 3]]
+    kahn = KahnTopologicalSort(CSRGraph.from_edges(n, edges, directed=True))
+    assert_equal(kahn.get_cyclic_vertices().tolist(), [n - 3, n - 2, n - 1])
+    assert_equal(kahn.get_level(n - 4), n - 4)
 
 
-
-
+def test_graphs_IncrementalConnectedComponents():
+    """ test the components follow the edges added to the graph """
+    G = Graph.read_from_file(fileinput.input("tinyG.txt"))
+    icc = IncrementalConnectedComponents(G)
+    assert_equal(icc.get_count(), 3)
+    assert_true(_same_partition(icc, ConnectedComponents(G), G.get_v()))
+    G.add_edge(6, 9)
+    assert_equal(icc.get_count(), 2)
+    assert_true(icc.are_connected(0, 12))
+    assert_equal(icc.get_id(0), icc.get_id(12))
+    assert_true(_same_partition(icc, ConnectedComponents(G), G.get_v()))
+    icc.detach()
+    G.add_edge(0, 7)
+    assert_equal(icc.get_count(), 2)
+    assert_false(icc.are_connected(0, 7))
+
+    W = EdgeWeightedGraph(4)
+    icc = IncrementalConnectedComponents(W)
+    W.add_edge(Edge(0, 3, 0.5))
+    assert_equal(icc.get_count(), 3)
+    assert_true(icc.are_connected(3, 0))
@@ -1,5 +1,11 @@
 from nose.tools import *
 from AlgoDS.treeDS import BST
+from AlgoDS.basicDS import IllegalArgument
+import os
+import random
+import shutil
+import sys
+import tempfile
 
 
 def test_treeDS_bst():
@@ -176,12 +182,126 @@ def test_treeDS_bst_keys():
     st["E"] = 13
 
     keys = st.keys()
-    assert_equal(keys.peek(), st.min())
+    assert_equal(next(keys), st.min())
     for key in keys:
         print key
 
 
-
-
-
-
+def test_treeDS_bst_deep():
+    """ test a degenerate tree deeper than the recursion limit """
+    st = BST()
+    n = sys.getrecursionlimit() + 500
+    for key in range(n):
+        st[key] = key
+    assert_equal(st.size(), n)
+    assert_equal(st[n - 1], n - 1)
+    assert_equal(st.max(), n - 1)
+    assert_equal(st.floor(n + 0.5), n - 1)
+    assert_equal(st.ceiling(-1), 0)
+    assert_equal(st.select(n - 2), n - 2)
+    assert_equal(st.rank(n - 1), n - 1)
+    assert_equal([key for key in st], range(n))
+
+
+def test_treeDS_bst_range():
+    """ test the range keys, size, values and items methods """
+    st = BST()
+    for indx, key in enumerate("SEARCHXMPL"):
+        st[key] = indx
+    assert_equal(list(st.keys("D", "M")), ["E", "H", "L", "M"])
+    assert_equal(list(st.keys("Y", "Z")), [])
+    assert_equal(list(st.keys(hi="C")), ["A", "C"])
+    assert_equal(st.size("D", "M"), 4)
+    assert_equal(st.size("E", "E"), 1)
+    assert_equal(st.size("M", "D"), 0)
+    assert_equal(st.size(lo="R"), 3)
+    assert_equal(list(st.values("R", "S")), [3, 0])
+    assert_equal(list(st.items("W", "Z")), [("X", 6)])
+
+
+def _check_sizes(st, node):
+    """ checks the subtree sizes and returns the size of node """
+    if node is None:
+        return 0
+    size = _check_sizes(st, node.left) + _check_sizes(st, node.right) + 1
+    assert_equal(node.size, size)
+    return size
+
+
+def test_treeDS_bst_delete():
+    """ test the delete, delete_min and delete_max methods """
+    st = BST()
+    for indx, key in enumerate("SEARCHXMPL"):
+        st[key] = indx
+    st.delete("E")
+    st.delete("Z")
+    assert_false("E" in st)
+    assert_equal(st.size(), 9)
+    assert_equal(st._root.left.key, "H")
+    st.delete("S")
+    assert_equal(st._root.key, "X")
+    st.delete_min()
+    assert_equal(st.min(), "C")
+    st.delete_max()
+    assert_equal(st.max(), "R")
+    assert_equal(list(st.keys()), ["C", "H", "L", "M", "P", "R"])
+    assert_equal(st.select(2), "L")
+    assert_equal(st.rank("P"), 4)
+    _check_sizes(st, st._root)
+
+
+def test_treeDS_bst_delete_random():
+    """ test deletes against a dict, checking the subtree sizes """
+    rng = random.Random(11)
+    st = BST()
+    expected = {}
+    for indx in range(2000):
+        key = rng.randint(0, 300)
+        if rng.random() < 0.5:
+            st[key] = indx
+            expected[key] = indx
+        else:
+            st.delete(key)
+            expected.pop(key, None)
+    assert_equal(list(st.items()), sorted(expected.items()))
+    assert_equal(_check_sizes(st, st._root), len(expected))
+
+
+def test_treeDS_bst_pop_range():
+    """ test the pop_range method """
+    st = BST()
+    for indx, key in enumerate("SEARCHXMPL"):
+        st[key] = indx
+    assert_equal(st.pop_range("D", "M"),
+                 [("E", 1), ("H", 5), ("L", 9), ("M", 7)])
+    assert_equal(list(st.keys()), ["A", "C", "P", "R", "S", "X"])
+    assert_equal(st.pop_range("Y", "Z"), [])
+    _check_sizes(st, st._root)
+
+
+def test_treeDS_bst_from_sorted():
+    """ test the linear time construction from sorted keys """
+    st = BST.from_sorted(range(1023), range(1023))
+    assert_equal(st.size(), 1023)
+    assert_equal(st._root.key, 511)
+    _check_sizes(st, st._root)
+    assert_equal(st.rank(700), 700)
+    assert_equal(st.select(3), 3)
+    assert_equal(list(st.keys(10, 12)), [10, 11, 12])
+    assert_equal(BST.from_sorted([], []).size(), 0)
+    assert_raises(IllegalArgument, BST.from_sorted, [2, 1], [0, 0])
+
+
+def test_treeDS_bst_save_load():
+    """ test saving and loading a tree """
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        st = BST()
+        for indx, key in enumerate("SEARCHXMPL"):
+            st[key] = indx * 0.5
+        st.save(os.path.join(tmp_dir, "bst"))
+        loaded = BST.load(os.path.join(tmp_dir, "bst"))
+        assert_equal(list(loaded.items()), list(st.items()))
+        _check_sizes(loaded, loaded._root)
+    finally:
+        shutil.rmtree(tmp_dir)
@@ -0,0 +1,110 @@
+from nose.tools import *
+from AlgoDS.treeDS import BTreeST
+from AlgoDS.basicDS import IllegalArgument
+import os
+import random
+import shutil
+import tempfile
+
+
+def setup():
+    global tmp_dir
+    tmp_dir = tempfile.mkdtemp()
+
+
+def teardown():
+    shutil.rmtree(tmp_dir)
+
+
+def _build(name, n=1000):
+    """ build a small order B-tree with a tiny cache, so that pages are
+    split and evicted a lot """
+    st = BTreeST(os.path.join(tmp_dir, name), order=4, cache_size=3)
+    expected = {}
+    rng = random.Random(5)
+    for indx in range(n):
+        key = rng.randint(0, n)
+        st[key] = indx
+        expected[key] = float(indx)
+    return st, expected
+
+
+def test_treeDS_btreest_put():
+    """ test the put and get methods """
+    st, expected = _build("put.bt")
+    assert_equal(st.size(), len(expected))
+    for key in expected:
+        assert_equal(st[key], expected[key])
+    assert_equal(st[-1], None)
+    assert_false(-1 in st)
+    assert_true(st._height > 1)
+
+
+def test_treeDS_btreest_ordered():
+    """ test the ordered symbol table methods """
+    st, expected = _build("ordered.bt")
+    keys = sorted(expected)
+    assert_equal(list(st.keys()), keys)
+    assert_equal(st.min(), keys[0])
+    assert_equal(st.max(), keys[-1])
+    assert_equal(st.select(10), keys[10])
+    assert_equal(st.rank(keys[10]), 10)
+    assert_equal(list(st.keys(100, 300)),
+                 [key for key in keys if 100 <= key <= 300])
+    assert_equal(st.size(100, 300), len(list(st.keys(100, 300))))
+    missing = [key for key in range(1, 1000) if key not in expected][0]
+    assert_equal(st.floor(missing), max(k for k in keys if k < missing))
+    assert_equal(st.ceiling(missing), min(k for k in keys if k > missing))
+    assert_equal(st.floor(-1), None)
+
+
+def test_treeDS_btreest_reopen():
+    """ test that a closed table is reopened without rebuilding """
+    st, expected = _build("reopen.bt")
+    st.close()
+    st = BTreeST(os.path.join(tmp_dir, "reopen.bt"))
+    assert_equal(st.size(), len(expected))
+    assert_equal(list(st.items()),
+                 [(key, expected[key]) for key in sorted(expected)])
+    st[-10] = 1.5
+    st.close()
+    with BTreeST(os.path.join(tmp_dir, "reopen.bt")) as st:
+        assert_equal(st[-10], 1.5)
+    assert_raises(IllegalArgument, BTreeST,
+                  os.path.join(tmp_dir, "reopen.bt"), order=8)
+
+
+def test_treeDS_btreest_key_dtype():
+    """ test that keys the key dtype cannot hold are rejected """
+    with BTreeST(os.path.join(tmp_dir, "dtype.bt")) as st:
+        for key in (1, 5, 9):
+            st[key] = key
+        assert_raises(IllegalArgument, st.__setitem__, 5.5, 100)
+        assert_raises(IllegalArgument, st.__setitem__, 2 ** 70, 100)
+        assert_raises(IllegalArgument, st.__getitem__, 5.5)
+        st[5.0] = 50
+        assert_equal(list(st.items()), [(1, 1.0), (5, 50.0), (9, 9.0)])
+        assert_equal(st.size(), 3)
+        assert_false(5.5 in st)
+        assert_equal(st.floor(5.5), 5)
+
+
+def test_treeDS_btreest_val_dtype():
+    """ test that a rejected value leaves the table unchanged """
+    path = os.path.join(tmp_dir, "vals.bt")
+    with BTreeST(path, order=4, val_dtype="i8") as st:
+        st[1] = 10
+        st[2] = 20
+        st[3] = 30
+        for val in (None, "x", 5.7, 2 ** 70):
+            assert_raises(IllegalArgument, st.__setitem__, 0, val)
+            assert_raises(IllegalArgument, st.__setitem__, 2, val)
+        assert_equal(list(st.items()), [(1, 10), (2, 20), (3, 30)])
+        assert_equal(st.size(), 3)
+        st[4] = 5.0
+    with BTreeST(path) as st:
+        assert_equal(list(st.items()), [(1, 10), (2, 20), (3, 30), (4, 5)])
+    with BTreeST(os.path.join(tmp_dir, "nan.bt")) as st:
+        st[1] = float("nan")
+        assert_true(st[1] != st[1])
+        assert_raises(IllegalArgument, st.__setitem__, float("nan"), 1.0)
@@ -0,0 +1,72 @@
+from nose.tools import *
+from AlgoDS.basicDS import IllegalArgument
+from AlgoDS.treeDS import BloomFilter
+from AlgoDS.treeDS import BloomFilterST
+from AlgoDS.treeDS import BST
+from AlgoDS.treeDS import BinarySearchST
+from AlgoDS.treeDS import UnOrderedSeqST
+
+
+def test_treeDS_bloomfilter():
+    """ test no false negatives and the false positive rate """
+    bloom = BloomFilter(1000, 0.01)
+    assert_equal(bloom.probes(), 7)
+    for i in range(1000):
+        bloom.add("key%d" % i)
+    assert_equal(bloom.size(), 1000)
+    for i in range(1000):
+        assert_true("key%d" % i in bloom)
+    false_positives = sum(1 for i in range(10000) if "miss%d" % i in bloom)
+    assert_true(false_positives < 300)
+    assert_raises(IllegalArgument, BloomFilter, 0)
+    assert_raises(IllegalArgument, BloomFilter, 10, 1.5)
+
+
+def test_treeDS_bloomfilterst():
+    """ test the filter in front of the symbol tables """
+    for st in (UnOrderedSeqST(), BinarySearchST(), BST()):
+        st["A"] = 1
+        bloom_st = BloomFilterST(st, capacity=4)
+        assert_true("A" in bloom_st)
+        for i in range(20):
+            bloom_st[i] = i * i
+        assert_equal(bloom_st.size(), 21)
+        assert_true(bloom_st.st() is st)
+        for i in range(20):
+            assert_equal(bloom_st[i], i * i)
+        assert_equal(bloom_st["A"], 1)
+        for i in range(100, 200):
+            assert_false(i in bloom_st)
+            assert_equal(bloom_st[i], None)
+        stats = bloom_st.stats()
+        assert_equal(stats["lookups"], 222)
+        assert_true(stats["rejected"] > 150)
+        assert_equal(stats["rejected"] + stats["false_positives"], 200)
+
+
+def test_treeDS_bloomfilterst_delete():
+    """ test deleted keys are absent after delete and rebuild """
+    bloom_st = BloomFilterST(BST(), capacity=8)
+    for i in range(8):
+        bloom_st[i] = i
+    bloom_st.delete(3)
+    assert_false(3 in bloom_st)
+    assert_equal(bloom_st.min(), 0)
+    for i in range(8, 16):
+        bloom_st[i] = i
+    assert_false(3 in bloom_st)
+    assert_equal(bloom_st.size(), 15)
+
+
+def test_treeDS_bloomfilterst_updates():
+    """ test that updates do not count toward the capacity """
+    bloom_st = BloomFilterST(BST(), capacity=4)
+    for i in range(100):
+        bloom_st[i % 3] = i
+    assert_equal(bloom_st._filter.size(), 3)
+    assert_equal(bloom_st._filter.capacity(), 4)
+    assert_equal(bloom_st[2], 98)
+    bloom_st.delete(2)
+    bloom_st[2] = 1
+    assert_equal(bloom_st[2], 1)
+    assert_raises(IllegalArgument, BloomFilterST(BinarySearchST()).delete, 1)
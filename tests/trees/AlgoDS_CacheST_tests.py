@@ -0,0 +1,49 @@
+from nose.tools import *
+from AlgoDS.treeDS import LRUCacheST
+from AlgoDS.treeDS import LFUCacheST
+
+
+def test_treeDS_lrucachest():
+    """ test the LRU eviction order and statistics """
+    evicted = []
+    st = LRUCacheST(3, on_evict=lambda key, val: evicted.append(key))
+    st["A"] = 1
+    st["B"] = 2
+    st["C"] = 3
+    assert_equal(st["A"], 1)
+    st["D"] = 4
+    assert_equal(evicted, ["B"])
+    assert_equal(st["B"], None)
+    st["C"] = 30
+    st["E"] = 5
+    assert_equal(evicted, ["B", "A"])
+    assert_equal(list(st.keys()), ["E", "C", "D"])
+    assert_equal(st.size(), 3)
+    stats = st.stats()
+    assert_equal(stats["hits"], 1)
+    assert_equal(stats["misses"], 1)
+    assert_equal(stats["evictions"], 2)
+    assert_equal(stats["hit_rate"], 0.5)
+
+
+def test_treeDS_lfucachest():
+    """ test the LFU eviction order """
+    evicted = []
+    st = LFUCacheST(3, on_evict=lambda key, val: evicted.append(key))
+    st["A"] = 1
+    st["B"] = 2
+    st["C"] = 3
+    st["A"]
+    st["A"]
+    st["B"]
+    st["D"] = 4
+    assert_equal(evicted, ["C"])
+    st["E"] = 5
+    assert_equal(evicted, ["C", "D"])
+    assert_equal(list(st.keys()), ["A", "B", "E"])
+    st.delete("E")
+    st["F"] = 6
+    st["G"] = 7
+    assert_equal(evicted, ["C", "D", "F"])
+    assert_true("A" in st)
+    assert_equal(st.stats()["hits"], 3)
@@ -0,0 +1,56 @@
+from nose.tools import *
+from AlgoDS.treeDS import PersistentBST
+import random
+
+
+def _build():
+    st = PersistentBST()
+    for indx, key in enumerate("SEARCHXMPL"):
+        st[key] = indx
+    return st
+
+
+def test_treeDS_persistentbst_put():
+    """ test that put leaves the old versions unchanged """
+    st = _build()
+    old = st.snapshot()
+    st["S"] = 100
+    st["B"] = 101
+    assert_equal(st["S"], 100)
+    assert_equal(old["S"], 0)
+    assert_false("B" in old)
+    assert_equal(old.size(), 10)
+    assert_equal(st.size(), 11)
+    assert_equal(st.rank("C"), 2)
+    assert_equal(old.rank("C"), 1)
+    # the subtree on the right of the root is shared
+    assert_true(st._root.right is old._root.right)
+
+
+def test_treeDS_persistentbst_delete():
+    """ test that delete leaves the old versions unchanged """
+    st = _build()
+    old = st.snapshot()
+    st.delete("E")
+    st.delete_min()
+    st.delete_max()
+    assert_equal(list(st.keys()), ["C", "H", "L", "M", "P", "R", "S"])
+    assert_equal(list(old.keys()), sorted("SEARCHXMPL"))
+    assert_equal(st.select(3), "M")
+    assert_equal(old.select(3), "H")
+
+
+def test_treeDS_persistentbst_iterate():
+    """ test that an iterator sees the version it started with """
+    st = PersistentBST()
+    keys = list(range(200))
+    random.Random(4).shuffle(keys)
+    for key in keys:
+        st[key] = key
+    seen = []
+    for key in st.keys():
+        seen.append(key)
+        st.delete(key)
+        st[key + 1000] = key
+    assert_equal(seen, list(range(200)))
+    assert_equal(st.min(), 1000)
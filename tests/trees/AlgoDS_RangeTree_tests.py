@@ -0,0 +1,65 @@
+from nose.tools import *
+from AlgoDS.treeDS import FenwickTree
+from AlgoDS.treeDS import SegmentTree
+from AlgoDS.basicDS import IndexOutOfBound
+import numpy as np
+
+
+def _updates(n, count=200):
+    rng = np.random.RandomState(7)
+    for indx in range(count):
+        lo, hi = sorted(rng.randint(0, n, size=2))
+        yield lo, hi, int(rng.randint(-5, 6))
+
+
+def test_treeDS_fenwick():
+    """ test the Fenwick tree against a numpy array """
+    values = np.arange(37, dtype=np.int64) % 7
+    tree = FenwickTree.from_array(values)
+    assert_equal(tree.size(), 37)
+    for lo, hi, delta in _updates(37):
+        tree.range_add(lo, hi, delta)
+        values[lo:hi + 1] += delta
+        tree.add(hi, 1)
+        values[hi] += 1
+        assert_equal(tree.range_sum(lo, hi), values[lo:hi + 1].sum())
+        assert_equal(tree.prefix_sum(lo), values[:lo + 1].sum())
+    assert_equal([tree.get(i) for i in range(37)], list(values))
+    assert_equal(tree.prefix_sum(-1), 0)
+    assert_raises(IndexOutOfBound, tree.add, 37, 1)
+
+
+def test_treeDS_fenwick_empty():
+    """ test a tree built from zeros """
+    tree = FenwickTree(5)
+    tree.add(2, 1.5)
+    assert_equal(tree.range_sum(0, 4), 1.5)
+    assert_equal(tree.range_sum(3, 4), 0)
+
+
+def test_treeDS_segmenttree():
+    """ test the segment tree against a numpy array """
+    values = np.arange(37, dtype=np.int64) % 5
+    tree = SegmentTree.from_array(values)
+    assert_equal(tree.size(), 37)
+    for lo, hi, delta in _updates(37):
+        tree.range_add(lo, hi, delta)
+        values[lo:hi + 1] += delta
+        tree.set(lo, delta)
+        values[lo] = delta
+        assert_equal(tree.range_sum(lo, hi), values[lo:hi + 1].sum())
+        assert_equal(tree.range_min(lo, hi), values[lo:hi + 1].min())
+        assert_equal(tree.range_max(lo, hi), values[lo:hi + 1].max())
+    assert_equal([tree.get(i) for i in range(37)], list(values))
+    assert_equal(tree.prefix_sum(36), values.sum())
+    assert_raises(IndexOutOfBound, tree.range_sum, 0, 37)
+
+
+def test_treeDS_segmenttree_float():
+    """ test a float tree built from zeros """
+    tree = SegmentTree(3)
+    tree.range_add(0, 2, -0.5)
+    tree.set(1, 2.0)
+    assert_equal(tree.range_min(0, 2), -0.5)
+    assert_equal(tree.range_max(0, 2), 2.0)
+    assert_equal(tree.range_sum(0, 2), 1.0)
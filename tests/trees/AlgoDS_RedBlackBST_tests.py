@@ -0,0 +1,125 @@
+from nose.tools import *
+from AlgoDS.treeDS import RedBlackBST
+import os
+import shutil
+import tempfile
+
+
+def _is_balanced(st, node):
+    """ returns the black height of the tree rooted at node, or -1 if
+    the red black invariant is violated """
+    if node is None:
+        return 0
+    if st._is_red(node.right):
+        return -1
+    if st._is_red(node) and st._is_red(node.left):
+        return -1
+    if node.size != st._size(node.left) + st._size(node.right) + 1:
+        return -1
+    left = _is_balanced(st, node.left)
+    right = _is_balanced(st, node.right)
+    if left == -1 or right == -1 or left != right:
+        return -1
+    if st._is_red(node):
+        return left
+    return left + 1
+
+
+def _build():
+    st = RedBlackBST()
+    for indx, key in enumerate("SEARCHEXAMPLE"):
+        st[key] = indx
+    return st
+
+
+def test_treeDS_rbbst_put():
+    """ test the put method keeps the tree balanced """
+    st = _build()
+    assert_equal(st.size(), 10)
+    assert_equal(st["E"], 12)
+    assert_equal(st["S"], 0)
+    assert_equal(st["Z"], None)
+    assert_false(st._is_red(st._root))
+    assert_not_equal(_is_balanced(st, st._root), -1)
+
+
+def test_treeDS_rbbst_sorted_insert():
+    """ test that sorted insertion gives logarithmic height """
+    st = RedBlackBST()
+    n = 4096
+    for key in range(n):
+        st[key] = key
+    assert_equal(st.size(), n)
+    assert_true(st.height() <= 2 * 12)
+    assert_not_equal(_is_balanced(st, st._root), -1)
+
+
+def test_treeDS_rbbst_ordered():
+    """ test the ordered symbol table methods """
+    st = _build()
+    assert_equal(st.min(), "A")
+    assert_equal(st.max(), "X")
+    assert_equal(st.floor("F"), "E")
+    assert_equal(st.ceiling("F"), "H")
+    assert_equal(st.select(3), "H")
+    assert_equal(st.rank("H"), 3)
+    assert_equal([key for key in st.keys()], sorted(set("SEARCHEXAMPLE")))
+
+
+def test_treeDS_rbbst_delete():
+    """ test the delete, delete_min and delete_max methods """
+    st = _build()
+    st.delete("E")
+    assert_false("E" in st)
+    assert_equal(st.size(), 9)
+    st.delete("Z")
+    assert_equal(st.size(), 9)
+    st.delete_min()
+    assert_equal(st.min(), "C")
+    st.delete_max()
+    assert_equal(st.max(), "S")
+    assert_equal(st.size(), 7)
+    assert_not_equal(_is_balanced(st, st._root), -1)
+    for key in "ACEHLMPRSX":
+        st.delete(key)
+    assert_true(st.is_empty())
+
+
+def test_treeDS_rbbst_delete_none_value():
+    """ test that a key whose value is None is found and deleted """
+    st = _build()
+    st["N"] = None
+    assert_true("N" in st)
+    assert_equal(st.size(), 11)
+    st.delete("N")
+    assert_false("N" in st)
+    assert_equal(st.size(), 10)
+    assert_not_equal(_is_balanced(st, st._root), -1)
+
+
+def test_treeDS_rbbst_from_sorted():
+    """ test the linear time construction from sorted keys """
+    for n in range(0, 200):
+        st = RedBlackBST.from_sorted(range(n), range(n))
+        assert_equal(st.size(), n)
+        assert_not_equal(_is_balanced(st, st._root), -1)
+        assert_false(st._is_red(st._root))
+        assert_equal(list(st.keys()), range(n))
+    st = RedBlackBST.from_sorted(range(1000), range(1000))
+    st[1000] = 0
+    st.delete(10)
+    assert_equal(st.select(10), 11)
+    assert_not_equal(_is_balanced(st, st._root), -1)
+
+
+def test_treeDS_rbbst_save_load():
+    """ test that a saved tree is loaded balanced """
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        st = _build()
+        st.save(os.path.join(tmp_dir, "rbbst"))
+        loaded = RedBlackBST.load(os.path.join(tmp_dir, "rbbst"))
+        assert_equal(list(loaded.items()), list(st.items()))
+        assert_not_equal(_is_balanced(loaded, loaded._root), -1)
+    finally:
+        shutil.rmtree(tmp_dir)
@@ -0,0 +1,192 @@
+from nose.tools import *
+from AlgoDS.treeDS import BinarySearchST
+from AlgoDS.treeDS import UnOrderedSeqST
+from AlgoDS.treeDS import SeparateChainingHashST
+from AlgoDS.treeDS import LinearProbingHashST
+from AlgoDS.basicDS import IllegalArgument
+import numpy as np
+import os
+import random
+import shutil
+import tempfile
+
+
+def _build():
+    st = BinarySearchST()
+    for indx, key in enumerate("SEARCHXMPL"):
+        st[key] = indx
+    return st
+
+
+def test_treeDS_binarysearchst_put():
+    """ test the put and get methods """
+    st = _build()
+    assert_equal(st.size(), 10)
+    assert_equal(st["S"], 0)
+    assert_equal(st["L"], 9)
+    assert_equal(st["Z"], None)
+    assert_true("X" in st)
+    assert_false("B" in st)
+
+
+def test_treeDS_binarysearchst_rank():
+    """ test the rank method """
+    st = _build()
+    assert_equal(st.rank("A"), 0)
+    assert_equal(st.rank("B"), 1)
+    assert_equal(st.rank("Z"), 10)
+    assert_equal(BinarySearchST().rank("A"), 0)
+
+
+def test_treeDS_binarysearchst_range():
+    """ test the range keys, size, values and items methods """
+    st = _build()
+    assert_equal(list(st.keys()), sorted("SEARCHXMPL"))
+    assert_equal(list(st.keys("D", "M")), ["E", "H", "L", "M"])
+    assert_equal(list(st.keys("Y", "Z")), [])
+    assert_equal(st.size("D", "M"), 4)
+    assert_equal(st.size("M", "D"), 0)
+    assert_equal(st.size(hi="C"), 2)
+    assert_equal(list(st.values("R", "S")), [3, 0])
+    assert_equal(list(st.items("W", "Z")), [("X", 6)])
+
+
+def test_treeDS_unorderedseqst_size():
+    """ test that updating a key does not change the size """
+    st = UnOrderedSeqST()
+    st["A"] = 0
+    st["A"] = 1
+    st["B"] = 0
+    assert_equal(st.size(), 2)
+    assert_true("B" in st)
+    st.delete("A")
+    assert_false("A" in st)
+    assert_equal(st.size(), 1)
+
+
+def _check_hash_st(st):
+    """ compare a hash ST with a dict under random puts and deletes """
+    expected = {}
+    rng = random.Random(17)
+    for indx in range(3000):
+        key = rng.randint(0, 500)
+        if rng.random() < 0.6:
+            st[key] = indx
+            expected[key] = indx
+        else:
+            st.delete(key)
+            expected.pop(key, None)
+    assert_equal(st.size(), len(expected))
+    assert_equal(sorted(st.keys()), sorted(expected))
+    for key in range(501):
+        assert_equal(key in st, key in expected)
+        assert_equal(st[key], expected.get(key))
+
+
+def test_treeDS_separatechaininghashst():
+    """ test the separate chaining hash ST """
+    st = SeparateChainingHashST()
+    _check_hash_st(st)
+    assert_true(len(st._chains) > 4)
+
+
+def test_treeDS_linearprobinghashst():
+    """ test the linear probing hash ST """
+    st = LinearProbingHashST()
+    _check_hash_st(st)
+    assert_true(st.size() <= 0.5 * len(st._keys))
+
+
+def test_treeDS_hashst_hash_func():
+    """ test a pluggable hash function with many collisions """
+    for cls in [SeparateChainingHashST, LinearProbingHashST]:
+        st = cls(hash_func=lambda key: len(key))
+        st["ab"] = 1
+        st["cd"] = 2
+        st["efg"] = 3
+        assert_equal(st["cd"], 2)
+        st.delete("ab")
+        assert_equal(st["cd"], 2)
+        assert_equal(st["ab"], None)
+        assert_equal(st.size(), 2)
+
+
+def test_treeDS_binarysearchst_from_sorted():
+    """ test the bulk constructors """
+    st = BinarySearchST.from_sorted(["A", "C", "E"], [1, 2, 3])
+    assert_equal(st.size(), 3)
+    assert_equal(st["C"], 2)
+    st["B"] = 4
+    assert_equal(list(st.keys()), ["A", "B", "C", "E"])
+    assert_raises(IllegalArgument, BinarySearchST.from_sorted,
+                  ["C", "A"], [1, 2])
+    st = BinarySearchST.from_items([("E", 1), ("A", 2), ("E", 3)])
+    assert_equal(list(st.items()), [("A", 2), ("E", 3)])
+
+
+def test_treeDS_binarysearchst_put_many():
+    """ test the batch put against single puts """
+    rng = random.Random(3)
+    single = BinarySearchST()
+    batched = BinarySearchST()
+    for batch in range(5):
+        keys = [rng.randint(0, 200) for indx in range(50)]
+        vals = [rng.random() for indx in range(50)]
+        for key, val in zip(keys, vals):
+            single[key] = val
+        batched.put_many(keys, vals)
+    assert_equal(list(batched.items()), list(single.items()))
+
+
+def test_treeDS_binarysearchst_get_many():
+    """ test the batch get for numeric and other keys """
+    st = BinarySearchST.from_sorted([1, 3, 5, 7], ["a", "b", "c", "d"])
+    assert_equal(list(st.get_many([0, 3, 7, 8, 5.0])),
+                 [None, "b", "d", None, "c"])
+    st = BinarySearchST.from_sorted(["A", "C"], [1, 2])
+    assert_equal(list(st.get_many(["C", "B"])), [2, None])
+    assert_equal(list(BinarySearchST().get_many([1])), [None])
+
+
+def test_treeDS_binarysearchst_get_many_string_keys():
+    """ test that string keys are converted at most once between
+    insertions """
+    st = BinarySearchST.from_sorted(["A", "C"], [1, 2])
+    assert_equal(list(st.get_many(["C", "B"])), [2, None])
+    # a string query does not need the numeric view at all
+    assert_equal(st._numeric_keys, None)
+    assert_equal(list(st.get_many([1, 2])), [None, None])
+    assert_true(st._numeric_keys is False)
+    assert_equal(list(st.get_many([1])), [None])
+    assert_true(st._numeric_keys is False)
+    st["B"] = 3
+    assert_equal(st._numeric_keys, None)
+
+
+def test_treeDS_binarysearchst_save_load():
+    """ test saving and loading strings and numbers """
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        st = _build()
+        st.save(os.path.join(tmp_dir, "strings"))
+        loaded = BinarySearchST.load(os.path.join(tmp_dir, "strings"))
+        assert_equal(list(loaded.items()), list(st.items()))
+        loaded["B"] = 20
+        assert_equal(loaded.rank("C"), 2)
+
+        st = BinarySearchST.from_sorted([1, 5, 9], [u"a", u"\xe9", u""])
+        st.save(os.path.join(tmp_dir, "numbers"))
+        loaded = BinarySearchST.load(os.path.join(tmp_dir, "numbers"),
+                                     mmap=True)
+        assert_true(isinstance(loaded._keys, np.memmap))
+        assert_equal(loaded[5], u"\xe9")
+        assert_equal(list(loaded.get_many([9, 2])), [u"", None])
+        loaded[3] = u"b"
+        loaded[5.5] = u"c"
+        assert_equal(list(loaded.keys()), [1, 3, 5, 5.5, 9])
+
+        st = BinarySearchST.from_sorted([1], [[1, 2]])
+        assert_raises(IllegalArgument, st.save,
+                      os.path.join(tmp_dir, "lists"))
+    finally:
+        shutil.rmtree(tmp_dir)
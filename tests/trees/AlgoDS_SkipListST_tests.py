@@ -0,0 +1,93 @@
+from nose.tools import *
+from AlgoDS.treeDS import SkipListST
+import random
+import threading
+
+
+def _build():
+    st = SkipListST()
+    for indx, key in enumerate("SEARCHEXAMPLE"):
+        st[key] = indx
+    return st
+
+
+def test_treeDS_skiplistst_put():
+    """ test the put, get and delete methods """
+    st = _build()
+    assert_equal(st.size(), 10)
+    assert_equal(st["E"], 12)
+    assert_equal(st["Z"], None)
+    assert_true("X" in st)
+    st.delete("X")
+    st.delete("Z")
+    assert_false("X" in st)
+    assert_equal(st.size(), 9)
+
+
+def test_treeDS_skiplistst_ordered():
+    """ test the ordered symbol table methods """
+    st = _build()
+    assert_equal(st.min(), "A")
+    assert_equal(st.max(), "X")
+    assert_equal(st.floor("F"), "E")
+    assert_equal(st.floor("0"), None)
+    assert_equal(st.ceiling("F"), "H")
+    assert_equal(st.ceiling("Y"), None)
+    assert_equal(st.select(3), "H")
+    assert_equal(st.select(10), None)
+    assert_equal(st.rank("H"), 3)
+    assert_equal(list(st.keys("D", "M")), ["E", "H", "L", "M"])
+    assert_equal(st.size("D", "M"), 4)
+
+
+def test_treeDS_skiplistst_random():
+    """ test rank and select against a sorted list under random puts and
+    deletes """
+    rng = random.Random(2)
+    st = SkipListST()
+    expected = set()
+    for indx in range(3000):
+        key = rng.randint(0, 500)
+        if rng.random() < 0.6:
+            st[key] = indx
+            expected.add(key)
+        else:
+            st.delete(key)
+            expected.discard(key)
+    keys = sorted(expected)
+    assert_equal(list(st.keys()), keys)
+    for rank in range(len(keys)):
+        assert_equal(st.select(rank), keys[rank])
+        assert_equal(st.rank(keys[rank]), rank)
+
+
+def test_treeDS_skiplistst_concurrent():
+    """ test readers running while a writer updates the list """
+    st = SkipListST()
+    for key in range(0, 1000, 2):
+        st[key] = key
+    errors = []
+
+    def writer():
+        for key in range(1, 1000, 2):
+            st[key] = key
+            st.delete(key - 1)
+
+    def reader():
+        try:
+            for indx in range(200):
+                keys = list(st.keys(100, 200))
+                assert keys == sorted(keys)
+                assert st.floor(500) is not None
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader) for indx in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert_equal(errors, [])
+    assert_equal(list(st.keys()), range(1, 1000, 2))
+    assert_equal(st.rank(501), 250)
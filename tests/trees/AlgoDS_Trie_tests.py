@@ -0,0 +1,76 @@
+from nose.tools import *
+from AlgoDS.treeDS import TrieST
+from AlgoDS.treeDS import TST
+from AlgoDS.basicDS import IllegalArgument
+
+WORDS = "she sells sea shells by the sea shore".split()
+
+
+def _build(cls):
+    st = cls()
+    for indx, word in enumerate(WORDS):
+        st[word] = indx
+    return st
+
+
+def test_treeDS_trie_put():
+    """ test the put, get and delete methods """
+    for cls in [TrieST, TST]:
+        st = _build(cls)
+        assert_equal(st.size(), 7)
+        assert_equal(st["sea"], 6)
+        assert_equal(st["shells"], 3)
+        assert_equal(st["shell"], None)
+        assert_false("s" in st)
+        st.delete("shells")
+        st.delete("shell")
+        assert_equal(st.size(), 6)
+        assert_false("shells" in st)
+        assert_true("she" in st)
+
+
+def test_treeDS_trie_keys():
+    """ test the keys and keys_with_prefix methods """
+    for cls in [TrieST, TST]:
+        st = _build(cls)
+        assert_equal(list(st.keys()), sorted(set(WORDS)))
+        assert_equal(list(st.keys_with_prefix("sh")),
+                     ["she", "shells", "shore"])
+        assert_equal(list(st.keys_with_prefix("she")), ["she", "shells"])
+        assert_equal(list(st.keys_with_prefix("x")), [])
+
+
+def test_treeDS_trie_match():
+    """ test the keys_that_match and longest_prefix_of methods """
+    for cls in [TrieST, TST]:
+        st = _build(cls)
+        assert_equal(list(st.keys_that_match(".he")), ["she", "the"])
+        assert_equal(list(st.keys_that_match("s..")), ["sea", "she"])
+        assert_equal(list(st.keys_that_match("....")), [])
+        assert_equal(st.longest_prefix_of("shellsort"), "shells")
+        assert_equal(st.longest_prefix_of("shell"), "she")
+        assert_equal(st.longest_prefix_of("quicksort"), None)
+
+
+def test_treeDS_trie_prune():
+    """ test that deleting from a trie removes the dead nodes """
+    st = TrieST()
+    st["shells"] = 1
+    st["she"] = 2
+    st.delete("shells")
+    assert_equal(st._get_node("shel"), None)
+    st.delete("she")
+    assert_equal(st._root.next, None)
+
+
+def test_treeDS_trie_sparse_links():
+    """ test that nodes only store the links they use """
+    st = TrieST()
+    st["sea"] = 1
+    st["sells"] = 2
+    st[u"s\xe9"] = 3
+    assert_equal(sorted(st._root.next), ["s"])
+    assert_equal(sorted(st._get_node("s").next), ["e", u"\xe9"])
+    assert_equal(list(st.keys()), ["sea", "sells", u"s\xe9"])
+    assert_raises(IllegalArgument, TrieST(radix=128).__setitem__,
+                  u"\xe9", 1)